@@ -54,6 +54,20 @@ def validintervalrange(v):
         raise argparse.ArgumentTypeError('Exception, Parser Error: float out of range.')
 
 
+def validformats(v):
+    """ a quick reader for comma-separated format specifications of three output columns"""
+    formats = tuple(item.strip() for item in v.split(','))
+    try:
+        if len(formats) != 3:
+            raise ValueError
+        for item in formats:
+            format(0.0, item)
+    except ValueError:
+        raise argparse.ArgumentTypeError('Exception, Parser Error: three float formats expected, '
+                                         'e.g. 12.3f,12.3f,10.3f')
+    return formats
+
+
 def parse(manualargs=None):
     """ parser for defining and reading key words from command line"""
     debug = True
@@ -69,6 +83,8 @@ def parse(manualargs=None):
                         help='%(type)s (ft, m): input and output units for horizontal lengths (X,Y) (def: %(default)s)')
     parser.add_argument('--verbose', type=str2bool, default=False,
                         help='bool: verbose / debug output (def: %(default)s)')
+    parser.add_argument('--cachedir', type=str, default=None,
+                        help='%(type)s: directory for binary parse cache of input files (def: %(default)s)')
     # well database section
     wdb = parser.add_argument_group('Keywords to generate well database')
     wdb.add_argument('--wdbfile', type=str, default='sample-wellheads.txt',
@@ -88,6 +104,30 @@ def parse(manualargs=None):
                              ' 3: output interpolated survey as Cartesian X, Y, Z\n')
     wdb.add_argument('--wdbinterval', type=validintervalrange, default=50.0,
                         help='flt >= 0.1: interpolation interval along MD in output mode 2/3 (def: %(default)s)')
+    wdb.add_argument('--wdbsurveyfile', type=str, default=None,
+                        help='%(type)s: combined CSV file containing well name, MD, INCL, AZIM of all wells replacing '
+                             'the individual survey files (def: %(default)s)')
+    wdb.add_argument('--wdbsurveysort', type=str2bool, default=False,
+                        help='bool: sort stations of the combined survey file by MD (def: %(default)s)')
+    wdb.add_argument('--wdbsidetrackfile', type=str, default=None,
+                        help='%(type)s: CSV file containing well name, parent well name and kick-off MD of sidetracks '
+                             'sharing the trajectory of their parent well (def: %(default)s)')
+    wdb.add_argument('--wdbthreads', type=int, default=1,
+                        help='%(type)s: number of threads reading survey files concurrently (def: %(default)s)')
+    wdb.add_argument('--wdbprocesses', type=int, default=0,
+                        help='%(type)s: number of processes building wells in parallel, 0: none (def: %(default)s)')
+    wdb.add_argument('--wdbsnapshot', type=str, default=None,
+                        help='%(type)s: snapshot file of the well database, unchanged wells are reused on the next run '
+                             '(def: %(default)s)')
+    wdb.add_argument('--wdbstore', type=str, default=None,
+                        help='%(type)s: SQLite file receiving well heads, surveys and markers (def: %(default)s)')
+    wdb.add_argument('--wdbformat', type=str, default='csv', choices=('csv', 'binary'),
+                        help='%(type)s: survey output file format, text or columnar binary table (def: %(default)s)')
+    wdb.add_argument('--wdbformats', type=validformats, default=None,
+                        help='STR: comma-separated formats of the three survey output columns, e.g. 12.3f,12.3f,10.3f '
+                             '(def: %(default)s)')
+    wdb.add_argument('--wdbcompress', type=str, default=None, choices=('gz', 'bz2', 'xz'),
+                        help='%(type)s: compression of survey output files (def: %(default)s)')
     # well marker section
     mdb = parser.add_argument_group('Keywords to generate well marker database')
     mdb.add_argument('--mrkfile', type=str, default='sample-markers.txt',
@@ -98,6 +138,10 @@ def parse(manualargs=None):
     mdb.add_argument('--mrkfilecol', default=(1, 2, 3, 4, 5),
                         help='TUP(5 * INT): index # of rows containing WELL NAME, MARKER CODE, MD [length],'
                              'DIP(opt) [deg], DAZIM(opt) [deg] (def: %(default)s)')
+    mdb.add_argument('--mrkfileout', type=str, default=None,
+                        help='%(type)s: report file of loaded markers, no report if not set (def: %(default)s)')
+    mdb.add_argument('--mrkformat', type=str, default='csv', choices=('csv', 'binary'),
+                        help='%(type)s: marker report file format, text or columnar binary table (def: %(default)s)')
     # stratigraphy section
     strat = parser.add_argument_group('Keywords to load stratigraphy for marker import')
     strat.add_argument('--stratdeffile', type=str, default='sample-stratdef.txt',
@@ -143,6 +187,8 @@ def getstatickeywords():
     statargs['surfaceunits'] = 'ft'
     # BOOL: verbose / debug output
     statargs['verbose'] = False
+    # STR: directory for binary parse cache of input files, None: no caching
+    statargs['cachedir'] = None
     # well database section
     # STR: CSV file containing well name, well head origin, and respective filename for directional survey
     statargs['wdbfile'] = 'sample-wellheads.txt'
@@ -158,6 +204,26 @@ def getstatickeywords():
     statargs['wdbmode'] = 2
     # FLOAT: interpolation interval along MD w.r.t. output mode >=.01
     statargs['wdbinterval'] = 50.0
+    # STR: combined CSV file containing well name, MD, INCL, AZIM of all wells, None: individual survey files
+    statargs['wdbsurveyfile'] = None
+    # BOOL: sort stations of the combined survey file by MD
+    statargs['wdbsurveysort'] = False
+    # STR: CSV file containing well name, parent well name, kick-off MD of sidetracks, None: no sidetracks
+    statargs['wdbsidetrackfile'] = None
+    # INT: number of threads reading survey files concurrently, 1: sequential loading
+    statargs['wdbthreads'] = 1
+    # INT: number of processes building wells in parallel, 0: no worker processes
+    statargs['wdbprocesses'] = 0
+    # STR: snapshot file of the well database, unchanged wells are reused on the next run, None: no snapshot
+    statargs['wdbsnapshot'] = None
+    # STR: SQLite file receiving well heads, surveys and markers, None: no SQLite store
+    statargs['wdbstore'] = None
+    # STR('csv', 'binary'): survey output file format, text or columnar binary table
+    statargs['wdbformat'] = 'csv'
+    # TUP(3 * STR): formats of the three survey output columns, None: defaults of the output mode
+    statargs['wdbformats'] = None
+    # STR('gz', 'bz2', 'xz'): compression of survey output files, None: plain text
+    statargs['wdbcompress'] = None
     # well marker section
     # STR: CSV file containing well name, marker code, depth, and optional dip orientations
     statargs['mrkfile'] = 'sample-markers.txt'
@@ -165,6 +231,10 @@ def getstatickeywords():
     statargs['mrkfilehd'] = 1
     # TUP(5 * INT): indeces of rows containing WELL NAME, MARKER CODE, MD [length], DIP(opt) [deg], DAZIM(opt) [deg]
     statargs['mrkfilecol'] = (1, 2, 3, 4, 5)
+    # STR: report file of loaded markers, None: no report
+    statargs['mrkfileout'] = None
+    # STR('csv', 'binary'): marker report file format, text or columnar binary table
+    statargs['mrkformat'] = 'csv'
     # stratigraphy section
     # STR: fixed-format CSV file containing marker code, marker name and optional data
     statargs['stratdeffile'] = 'sample-stratdef.txt'
@@ -176,9 +246,14 @@ def getstatickeywords():
 def buildwelldb(kwargs):
     """ pop and prepare parameter dict and build well db"""
     debug = False
-    general = ['datadir', 'depthunit', 'surfaceunits', 'verbose']
+    general = ['datadir', 'depthunit', 'surfaceunits', 'verbose', 'cachedir']
     specific = {'filename_in': 'wdbfile', 'headerlines_in': 'wdbfilehd', 'columns_in': 'wdbfilecol',
-                'mode': 'wdbmode', 'interval': 'wdbinterval'}
+                'mode': 'wdbmode', 'interval': 'wdbinterval', 'compression_out': 'wdbcompress',
+                'formats_out': 'wdbformats',
+                'filename_survey': 'wdbsurveyfile', 'sort_survey': 'wdbsurveysort',
+                'filename_sidetracks': 'wdbsidetrackfile', 'threads': 'wdbthreads', 'processes': 'wdbprocesses',
+                'snapshot': 'wdbsnapshot', 'store': 'wdbstore',
+                'output_format': 'wdbformat'}
     wdbargs = dict()
     try:
         for item in general:
@@ -203,9 +278,10 @@ def buildmarkerdb(welldb, kwargs):
     :return: WellMarkerLoading object
     """
     debug = False
-    general = ['datadir', 'verbose']
+    general = ['datadir', 'verbose', 'cachedir']
     specific = {'filename_in': 'mrkfile', 'headerlines_in': 'mrkfilehd', 'columns_in': 'mrkfilecol',
-                'filename_strat_def': 'stratdeffile', 'filename_strat_order': 'stratordfile'}
+                'filename_strat_def': 'stratdeffile', 'filename_strat_order': 'stratordfile',
+                'filename_out': 'mrkfileout', 'output_format': 'mrkformat'}
     mdbargs = {}
     try:
         # todo
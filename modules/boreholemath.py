@@ -10,14 +10,74 @@
 
 
 import math
+import os
 import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
 from re import match
+from threading import Lock
 
 from modules import fileio
 
 
+def calc_subtended_alpha(incla, azima, inclb, azimb):
+    """
+    subtended (dogleg) angle between two borehole tangents given in spherical coordinates
+
+    :param incla: inclination at first point [rad]
+    :param azima: azimuth at first point [rad]
+    :param inclb: inclination at second point [rad]
+    :param azimb: azimuth at second point [rad]
+    :return: subtended angle alpha [rad]
+    """
+    factor_a = math.sin((inclb - incla) / 2)
+    factor_b = math.sin((azimb - azima) / 2)
+    return 2 * math.asin(math.sqrt(factor_a * factor_a + math.sin(inclb) * math.sin(incla) * factor_b * factor_b))
+
+
+def calc_shape_factor(alpha):
+    """
+    minimum curvature shape (ratio) factor using a series expansion for small angles
+
+    :param alpha: subtended angle [rad]
+    :return: shape factor (1.0 for straight hole sections)
+    """
+    if alpha < 0.02:
+        alpha2 = alpha * alpha
+        return 1 + alpha2 / 12 * (1 + alpha2 / 10 * (1 + alpha2 / 168 * (1 + 31 * alpha2 / 18)))
+    else:
+        return math.tan(alpha / 2) / (alpha / 2)
+
+
+def calc_tangential_factor(alpha, alphastarcomp, fraction):
+    """
+    weighting coefficient of one end point tangent for a tangent interpolated along the arc
+
+    :param alpha: subtended angle of the complete arc [rad]
+    :param alphastarcomp: partial angle of the arc opposite to the weighted end point [rad]
+    :param fraction: partial length of the arc corresponding to alphastarcomp (0...1)
+    :return: weighting coefficient
+    """
+    # check for angle approximation stability according to paper's instructions
+    if alpha >= 0.02:
+        return math.sin(alphastarcomp) / math.sin(alpha)
+    elif abs(alpha) <= 0.0001:
+        return fraction
+    else:
+        alpha2 = alpha * alpha
+        fraction2 = fraction * fraction
+        return fraction + alpha2 * (fraction * (1.0 / 6.0 + fraction2 / 6.0) + alpha2 * (fraction * (7.0 / 360.0
+                        + fraction2 * (-1.0 / 36.0 + fraction2 / 120.0)) + alpha2 * (fraction * (31.0 / 15120.0
+                        + fraction2 * (-7.0 / 2160.0 + fraction2 * (1.0 / 720.0 - fraction2 / 5040.0)))
+                        + fraction * alpha2 * (127.0 / 604800.0 + fraction2 * (-31.0 / 90720.0 + fraction2
+                        * (7.0 / 43200.0 + fraction2 * (-1.0 / 30240.0 + fraction2 / 362880.0)))))))
+
+
 class CartPoint(object):
     """a simple point class for Cartesian coordinates"""
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x=0.0, y=0.0, z=0.0):
         """
         initialize point class using three vector components
@@ -57,20 +117,19 @@ def scale(self, scaler=1.0):
         self.y *= scaler
         self.z *= scaler
 
-    def output_list(self):
+    def output_values(self):
         """
-        convert three components for exporting to CSV file
+        unformatted three components for bulk export to CSV file
 
-        :return: three floats (X,Y,Z) formatted list of str
+        :return: tuple of three floats (X,Y,Z)
         """
-        width = 14
-        precision = 2
-        out = [self.x, self.y, self.z]
-        return [f'{i:{width}.{precision}f}' for i in out]
+        return self.x, self.y, self.z
 
 
 class CLPoint(object):
     """point class for curvelinear coordinates and associated tangential unit vector"""
+    __slots__ = ('md', 'incl', 'azim', 'tangN', 'tangE', 'tangV')
+
     def __init__(self, md=0.0, incl=0.0, azim=0.0):
         """
         for given spherical coordinates set measured depth and angles and calculate a corresponding
@@ -87,6 +146,24 @@ def __init__(self, md=0.0, incl=0.0, azim=0.0):
         self.tangE = math.sin(self.incl) * math.sin(self.azim)
         self.tangV = math.cos(self.incl)
 
+    @classmethod
+    def from_survey(cls, survey, index):
+        """
+        create a point as a view of one station of a survey engine without recalculating its tangential vector
+
+        :param survey: MinCurvSurvey instance
+        :param index: station index
+        :return: CLPoint instance
+        """
+        point = cls.__new__(cls)
+        point.md = survey.md[index]
+        point.incl = survey.incl[index]
+        point.azim = survey.azim[index]
+        point.tangN = survey.tangn[index]
+        point.tangE = survey.tange[index]
+        point.tangV = survey.tangv[index]
+        return point
+
     def __str__(self):
         """overloaded string operator"""
         return 'MD: {0:10.2f}, Inclination: {1:8.3f}, Azimuth: {2:8.3f}'.format(self.md, math.degrees(self.incl),
@@ -113,19 +190,21 @@ def update_angles(self, tangn, tange, tangv):
         # 0 <= phi <2 * PI
         self.azim = (math.pi * 2.0 + math.atan2(self.tangE, self.tangN)) % (math.pi * 2.0)
 
-    def output_list(self):
+    def output_values(self):
         """
-        convert three components for exporting to CSV file
+        unformatted three components for bulk export to CSV file
 
-        :return: three floats (MD[length], INCL[deg], AZIM[deg]) formatted list of str
+        :return: tuple of three floats (MD[length], INCL[deg], AZIM[deg])
         """
-        return [f'{self.md:{10}.{2}f}', f'{math.degrees(self.incl):{10}.{5}f}', f'{math.degrees(self.azim):{10}.{5}f}']
+        return self.md, math.degrees(self.incl), math.degrees(self.azim)
 
 
 class MinCurvPair(object):
     """
 
     """
+    __slots__ = ('pA', 'pB', 'deltaMD', 'alpha', 'dls', 'shapefactor')
+
     def __init__(self, pointa, pointb):
         """
 
@@ -138,7 +217,26 @@ def __init__(self, pointa, pointb):
         self.alpha = self.calc_subtended_alpha()
         self.dls = self.calc_dog_leg_severity()
         self.shapefactor = self.calc_shape_factor()
-        
+
+    @classmethod
+    def from_survey(cls, survey, index):
+        """
+        create a pair as a view of two consecutive stations of a survey engine using its precalculated
+        min. curvature parameters
+
+        :param survey: MinCurvSurvey instance
+        :param index: pair index, i.e. index of the upper station
+        :return: MinCurvPair instance
+        """
+        pair = cls.__new__(cls)
+        pair.pA = CLPoint.from_survey(survey, index)
+        pair.pB = CLPoint.from_survey(survey, index + 1)
+        pair.deltaMD = pair.pB.md - pair.pA.md
+        pair.alpha = survey.alpha[index]
+        pair.dls = survey.dls[index]
+        pair.shapefactor = survey.shapefactor[index]
+        return pair
+
     def __str__(self):
             """ overloading string operator """
             return 'dMD: {0:8.2f}, Alpha: {1:10.3f},'\
@@ -150,28 +248,22 @@ def calc_subtended_alpha(self):
 
         :return:
         """
-        factor_a = math.sin((self.pB.incl - self.pA.incl) / 2)
-        factor_b = math.sin((self.pB.azim - self.pA.azim) / 2)
-        return 2 * math.asin(math.sqrt(factor_a * factor_a + math.sin(self.pB.incl) *
-                                        math.sin(self.pA.incl) * factor_b * factor_b))
+        return calc_subtended_alpha(self.pA.incl, self.pA.azim, self.pB.incl, self.pB.azim)
         
     def calc_dog_leg_severity(self):
         """
 
         :return:
         """
-        return math.degrees(self.alpha) * 100.0 / self.deltaMD
+        # stations at equal MD (zero-length pair) do not bend the borehole
+        return math.degrees(self.alpha) * 100.0 / self.deltaMD if self.deltaMD > 0.0 else 0.0
 
     def calc_shape_factor(self):
         """
 
         :return:
         """
-        if self.alpha < 0.02:
-            alpha2 = self.alpha * self.alpha
-            return 1 + alpha2 / 12 * (1 + alpha2 / 10 * (1 + alpha2 / 168 * (1 + 31 * alpha2 / 18)))
-        else:
-            return math.tan(self.alpha / 2) / (self.alpha / 2)
+        return calc_shape_factor(self.alpha)
 
     def calc_interpolation_md(self, depth):
         """
@@ -202,6 +294,21 @@ def calc_interpolation_md(self, depth):
             point.update_angles(tangstarn, tangstare, tangstarv)
             return point
 
+    def calc_interpolation_delta(self, depth):
+        """
+        closed-form position along the arc relative to the first point of the pair, i.e. the min. curvature step
+        to the interpolated tangent over the partial subtended angle
+
+        :param depth: depth below first point of the pair
+        :return: CartPoint (North, East, TVD) in depth units
+        """
+        if abs(depth) < 0.0001 or self.deltaMD <= 0.0:
+            return CartPoint(0.0, 0.0, 0.0)
+        point = self.calc_interpolation_md(depth)
+        scaler = depth * calc_shape_factor(depth / self.deltaMD * self.alpha) / 2.0
+        return CartPoint(scaler * (self.pA.tangN + point.tangN), scaler * (self.pA.tangE + point.tangE),
+                         scaler * (self.pA.tangV + point.tangV))
+
     def calc_tangential_factor(self, alphastarcomp, fraction):
         """
 
@@ -209,19 +316,457 @@ def calc_tangential_factor(self, alphastarcomp, fraction):
         :param fraction:
         :return:
         """
-        # check for angle approximation stability according to paper's instructions
-        if self.alpha >= 0.02:
-            return math.sin(alphastarcomp) / math.sin(self.alpha)
-        elif abs(self.alpha) <= 0.0001:
-            return fraction
+        return calc_tangential_factor(self.alpha, alphastarcomp, fraction)
+
+
+class MinCurvSurvey(object):
+    """
+    array-backed minimum curvature engine holding a complete survey as columns (struct of arrays)
+    and calculating subtended angles, dog leg severities, shape factors and cumulative positions in batch
+    """
+    def __init__(self, md=(), incl=(), azim=(), degrees=True, tiein=(0.0, 0.0, 0.0)):
+        """
+        set up survey columns and calculate all min. curvature parameters
+
+        :param md: sequence of measured depths in length units along borehole from KB
+        :param incl: sequence of borehole inclinations measured from vertical
+        :param azim: sequence of borehole azimuths measured from grid North
+        :param degrees: angles supplied in degrees (True) or radians (False)
+        :param tiein: position (North, East, TVD) of the first station, e.g. the kick-off point of a sidetrack
+                      on the trajectory of its parent well
+        """
+        self.md = array('d', md)
+        if degrees:
+            self.incl = array('d', map(math.radians, incl))
+            self.azim = array('d', map(math.radians, azim))
+        else:
+            self.incl = array('d', incl)
+            self.azim = array('d', azim)
+        if not len(self.md) == len(self.incl) == len(self.azim):
+            raise ValueError('Exception: Survey columns MD, INCL, AZIM differ in length')
+        self.tiein = tuple(tiein)
+        # tangential unit vectors per station
+        self.tangn = array('d')
+        self.tange = array('d')
+        self.tangv = array('d')
+        # min. curvature parameters per pair of stations (station i-1 to i stored at i-1)
+        self.alpha = array('d')
+        self.dls = array('d')
+        self.shapefactor = array('d')
+        # cumulative position per station relative to the tie-in reference in depth units
+        self.north = array('d')
+        self.east = array('d')
+        self.tvd = array('d')
+        # monotone TVD segments, built on first inverse lookup
+        self.tvd_runs = None
+        self.calculate(0)
+
+    def __len__(self):
+        """number of survey stations"""
+        return len(self.md)
+
+    def __str__(self):
+        """overloaded string operator"""
+        return 'Stations: {0:d}, MD: {1:10.2f} to {2:10.2f}'.format(len(self.md), self.md[0] if self.md else 0.0,
+                                                                   self.md[-1] if self.md else 0.0)
+
+    def calculate(self, start=0):
+        """
+        (re)calculate tangents, pair parameters and cumulative positions for all stations from index start
+
+        :param start: index of first station to be calculated, preceding results are kept
+        """
+        stations = len(self.md)
+        self.tvd_runs = None
+        # drop results which are going to be recalculated
+        for column in (self.tangn, self.tange, self.tangv, self.north, self.east, self.tvd):
+            del column[start:]
+        for column in (self.alpha, self.dls, self.shapefactor):
+            del column[max(start - 1, 0):]
+        sin = math.sin
+        cos = math.cos
+        md = self.md
+        incl = self.incl
+        azim = self.azim
+        tangn = self.tangn
+        tange = self.tange
+        tangv = self.tangv
+        for index in range(start, stations):
+            sinincl = sin(incl[index])
+            tangn.append(sinincl * cos(azim[index]))
+            tange.append(sinincl * sin(azim[index]))
+            tangv.append(cos(incl[index]))
+        if start == 0 and stations:
+            self.north.append(self.tiein[0])
+            self.east.append(self.tiein[1])
+            self.tvd.append(self.tiein[2])
+        for index in range(max(start, 1), stations):
+            prev = index - 1
+            alpha = calc_subtended_alpha(incl[prev], azim[prev], incl[index], azim[index])
+            deltamd = md[index] - md[prev]
+            shapefactor = calc_shape_factor(alpha)
+            self.alpha.append(alpha)
+            self.dls.append(math.degrees(alpha) * 100.0 / deltamd if deltamd > 0.0 else 0.0)
+            self.shapefactor.append(shapefactor)
+            scaler = deltamd * shapefactor / 2.0
+            self.north.append(self.north[prev] + scaler * (tangn[prev] + tangn[index]))
+            self.east.append(self.east[prev] + scaler * (tange[prev] + tange[index]))
+            self.tvd.append(self.tvd[prev] + scaler * (tangv[prev] + tangv[index]))
+
+    def append_station(self, md, incl, azim, degrees=True):
+        """
+        extend the survey by one station below the last one and calculate its pair parameters and cumulative
+        position without touching the preceding stations
+
+        :param md: measured depth in length units, needs to be larger than the last MD of the survey
+        :param incl: borehole inclination measured from vertical
+        :param azim: borehole azimuth measured from grid North
+        :param degrees: angles supplied in degrees (True) or radians (False)
+        """
+        if self.md and md <= self.md[-1]:
+            raise ValueError('Exception: MD values are not ascending')
+        if degrees:
+            incl = math.radians(incl)
+            azim = math.radians(azim)
+        self.md.append(md)
+        self.incl.append(incl)
+        self.azim.append(azim)
+        self.calculate(len(self.md) - 1)
+
+    def build_tvd_index(self, tolerance=0.0001):
+        """
+        split the borehole into runs of strictly increasing, strictly decreasing or constant TVD, knots are the
+        survey stations plus the horizontal turning points inside arcs with tangents pointing up and down
+
+        :param tolerance: MD tolerance of the turning points
+        :return: tuple of knot MDs, knot TVDs and list of runs (first knot, last knot, direction +1/-1/0)
+        """
+        knot_md = array('d')
+        knot_tvd = array('d')
+        for index in range(len(self.md)):
+            if index and self.tangv[index - 1] * self.tangv[index] < 0.0:
+                # bisection for the horizontal tangent within the arc
+                pair = self.get_pair(index - 1)
+                low, high = 0.0, pair.deltaMD
+                while high - low > tolerance:
+                    middle = (low + high) / 2.0
+                    if pair.calc_interpolation_md(middle).tangV * self.tangv[index - 1] > 0.0:
+                        low = middle
+                    else:
+                        high = middle
+                mdepth = self.md[index - 1] + (low + high) / 2.0
+                knot_md.append(mdepth)
+                knot_tvd.append(self.interpolate_position(mdepth)[2])
+            knot_md.append(self.md[index])
+            knot_tvd.append(self.tvd[index])
+        runs = []
+        for index in range(len(knot_md) - 1):
+            delta = knot_tvd[index + 1] - knot_tvd[index]
+            direction = (delta > 0.0) - (delta < 0.0)
+            if runs and runs[-1][2] == direction and direction != 0:
+                runs[-1] = (runs[-1][0], index + 1, direction)
+            else:
+                runs.append((index, index + 1, direction))
+        self.tvd_runs = (knot_md, knot_tvd, runs)
+        return self.tvd_runs
+
+    def mds_at_tvd(self, tvd, tolerance=0.0001):
+        """
+        inverse lookup of all measured depths at which the borehole crosses a TVD, wells turning upwards may
+        cross the same TVD several times
+
+        :param tvd: TVD relative to the tie-in reference in depth units
+        :param tolerance: MD tolerance of the returned depths
+        :return: list of MD values sorted by depth
+        """
+        if self.tvd_runs is None:
+            self.build_tvd_index()
+        knot_md, knot_tvd, runs = self.tvd_runs
+        mds = []
+        for first, last, direction in runs:
+            top = knot_tvd[first]
+            bottom = knot_tvd[last]
+            if direction == 0:
+                mdepth = knot_md[first] if tvd == top else None
+            elif not min(top, bottom) <= tvd <= max(top, bottom):
+                mdepth = None
+            else:
+                # bisection of knots within the monotone run
+                low, high = first, last
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if (knot_tvd[middle] - tvd) * direction < 0.0:
+                        low = middle
+                    else:
+                        high = middle
+                mdepth = self._solve_md_at_tvd(knot_md[low], knot_md[high], tvd, direction, tolerance)
+            # knots shared by neighbouring runs produce duplicates
+            if mdepth is not None and (not mds or abs(mdepth - mds[-1]) > tolerance):
+                mds.append(mdepth)
+        return mds
+
+    def _solve_md_at_tvd(self, low, high, tvd, direction, tolerance):
+        """
+        bisection along the borehole for the MD of a TVD within a monotone interval
+
+        :param low: upper MD of the interval
+        :param high: lower MD of the interval
+        :param tvd: TVD relative to the first station
+        :param direction: +1 for TVD increasing with MD, -1 for decreasing
+        :param tolerance: MD tolerance
+        :return: MD value
+        """
+        if self.interpolate_position(low)[2] == tvd:
+            return low
+        if self.interpolate_position(high)[2] == tvd:
+            return high
+        while high - low > tolerance:
+            middle = (low + high) / 2.0
+            if (self.interpolate_position(middle)[2] - tvd) * direction < 0.0:
+                low = middle
+            else:
+                high = middle
+        return (low + high) / 2.0
+
+    def get_point(self, index):
+        """
+        :param index: station index
+        :return: CLPoint view of a station
+        """
+        return CLPoint.from_survey(self, index)
+
+    def get_points(self):
+        """
+        :return: list of CLPoint views of all stations
+        """
+        return [CLPoint.from_survey(self, index) for index in range(len(self.md))]
+
+    def get_pair(self, index):
+        """
+        :param index: pair index, i.e. index of the upper station
+        :return: MinCurvPair view of two consecutive stations
+        """
+        return MinCurvPair.from_survey(self, index)
+
+    def get_pairs(self):
+        """
+        :return: list of MinCurvPair views of all consecutive stations
+        """
+        return [MinCurvPair.from_survey(self, index) for index in range(len(self.md) - 1)]
+
+    def locate(self, mdepth):
+        """
+        find the pair containing a measured depth by bisection of the (sorted) MD column
+
+        :param mdepth: measured depth, values outside of the survey resolve to the first / last pair
+        :return: pair index, 0 for a survey of a single station
+        """
+        index = bisect_left(self.md, mdepth, 1) - 1
+        return max(min(index, len(self.md) - 2), 0)
+
+    def interpolate_point(self, mdepth):
+        """
+        interpolate a curvelinear point at a measured depth within the survey
+
+        :param mdepth: measured depth
+        :return: CLPoint instance
+        """
+        if len(self.md) < 2:
+            # single station, e.g. the tie-in of a sidetrack without branch stations
+            return self.get_point(0)
+        index = self.locate(mdepth)
+        return self.get_pair(index).calc_interpolation_md(mdepth - self.md[index])
+
+    def interpolate_position(self, mdepth):
+        """
+        closed-form position along the circular arc of the pair containing a measured depth, i.e. the min.
+        curvature step from the upper station to the interpolated tangent over the partial subtended angle
+
+        :param mdepth: measured depth within the survey
+        :return: tuple of (North, East, TVD) relative to the tie-in reference in depth units
+        """
+        if len(self.md) < 2:
+            return self.north[0], self.east[0], self.tvd[0]
+        index = self.locate(mdepth)
+        delta = self.get_pair(index).calc_interpolation_delta(mdepth - self.md[index])
+        return self.north[index] + delta.x, self.east[index] + delta.y, self.tvd[index] + delta.z
+
+
+def iter_survey_stations(lines):
+    """
+    convert rows of a deviation survey file into stations, checking for non-negative and ascending MD values
+    and adding a surface point if the survey does not start at KB
+
+    :param lines: iterable of rows (MD, INCL, AZIM) of str
+    :return: generator of tuples (MD, INCL [deg], AZIM [deg]) of float
+    """
+    prev = -1
+    for line in lines:
+        try:
+            # convert data to numbers and check for depth-sorting
+            md, incl, azim = [float(i) for i in line]
+            if prev < 0.0:
+                # check first depth value to be non-negative
+                if md < 0.0:
+                    raise ValueError('Exception: first MD value is negative')
+                # check first depth value to be at KB or add surface point
+                elif md >= 0.0001:
+                    print('Warning: Adding surface point to survey data')
+                    yield 0.0, 0.0, 0.0
+            elif md < prev:
+                raise ValueError('Exception: MD values are not ascending')
+            prev = md
+        except ValueError as err:
+            print('Exception: Error during conversion of survey data\n', err.args)
+            sys.exit(1)
+        yield md, incl, azim
+
+
+def get_output_header(mode, wellname, depthunit, surfunit, relative_coords):
+    """
+    output file name and column header of a survey conversion mode
+
+    :param mode: 1: original Cartesian, 2: interpolated curvelinear, 3: interpolated Cartesian coordinates
+    :param wellname: well name
+    :param depthunit: vertical length unit
+    :param surfunit: horizontal length unit
+    :param relative_coords: Cartesian coordinates relative to well head (True) or absolute (False)
+    :return: tuple of output filename (str) and header (tuple of str)
+    """
+    wellnote = 'Well: ' + wellname
+    filename_out = 'out_' + wellname
+    if mode == 2:
+        filename_out += '_borehole_curve_inter.txt'
+        outheader = (wellnote, 'MD ['+depthunit+']', 'INCL [deg]', 'AZIM [deg]')
+    else:
+        if mode == 1:
+            filename_out += '_borehole_cart_orig.txt'
         else:
-            alpha2 = self.alpha * self.alpha
-            fraction2 = fraction * fraction
-            return fraction + alpha2 * (fraction * (1.0 / 6.0 + fraction2 / 6.0) + alpha2 * (fraction * (7.0 / 360.0
-                            + fraction2 * (-1.0 / 36.0 + fraction2 / 120.0)) + alpha2 * (fraction * (31.0 / 15120.0
-                            + fraction2 * (-7.0 / 2160.0 + fraction2 * (1.0 / 720.0 - fraction2 / 5040.0)))
-                            + fraction * alpha2 * (127.0 / 604800.0 + fraction2 * (-31.0 / 90720.0 + fraction2
-                            * (7.0 / 43200.0 + fraction2 * (-1.0 / 30240.0 + fraction2 / 362880.0)))))))
+            filename_out += '_borehole_cart_inter.txt'
+        if relative_coords:
+            outheader = (wellnote, 'dX(N) ['+surfunit+']', 'dY(E) ['+surfunit+']', 'dZ(TVD) ['+depthunit+']')
+        else:
+            outheader = (wellnote, 'X(N) ['+surfunit+']', 'Y(E) ['+surfunit+']', 'Z(TVD) ['+depthunit+']')
+    return filename_out, outheader
+
+
+def get_output_formats(mode, formats=None):
+    """
+    per column format specifications of a survey conversion mode for the output_values of :class:`CartPoint`
+    and :class:`CLPoint`, defaults: '14.2f' for X, Y, Z and '10.2f', '10.5f', '10.5f' for MD, INCL, AZIM
+
+    :param mode: 1: original Cartesian, 2: interpolated curvelinear, 3: interpolated Cartesian coordinates
+    :param formats: user supplied format specifications for the three columns, e.g. ('12.3f', '12.3f', '10.3f')
+    :return: tuple of three format specifications (str)
+    """
+    if formats is None:
+        if mode == 2:
+            return '10.2f', '10.5f', '10.5f'
+        return '14.2f', '14.2f', '14.2f'
+    if len(formats) != 3:
+        raise ValueError('Exception: Output formats need to be specified for three columns')
+    return tuple(formats)
+
+
+def get_surface_scaler(depthunit, surfunit):
+    """
+    :param depthunit: vertical length unit
+    :param surfunit: horizontal length unit
+    :return: scaling factor converting horizontal lengths from depth units to surface units
+    """
+    if depthunit == surfunit:
+        return 1.0
+    elif depthunit == 'ft':
+        return .3048
+    # unlikely case
+    else:
+        return 1/.3048
+
+
+class SurveyCache(object):
+    """
+    process-wide LRU cache of parsed and computed surveys, wells referencing the same deviation file (e.g.
+    re-entries or pilot holes) share one read-only MinCurvSurvey
+    """
+    def __init__(self, maxsize=256):
+        """
+        :param maxsize: maximum number of cached surveys, 0: caching disabled
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """number of cached surveys"""
+        return len(self.entries)
+
+    def __str__(self):
+        """overloaded string operator"""
+        return 'Cached surveys: {0:d} of {1:d}, hits: {2:d}, misses: {3:d}'.format(len(self.entries), self.maxsize,
+                                                                                    self.hits, self.misses)
+
+    @staticmethod
+    def get_key(reader):
+        """
+        key identifying a survey by file identity (path, size, modification time) and the file shape
+
+        :param reader: BHReaderWriter set up for the deviation survey file
+        :return: tuple
+        """
+        filename = reader.path + '\\' + reader.filein
+        stat = os.stat(filename)
+        return os.path.abspath(filename), stat.st_size, stat.st_mtime, tuple(reader.columns), reader.headerlines
+
+    def get(self, key):
+        """
+        :param key: survey key, see :meth:`get_key`
+        :return: cached tuple of header lines and MinCurvSurvey or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """
+        store a survey and evict the least recently used ones beyond the size bound
+
+        :param key: survey key, see :meth:`get_key`
+        :param entry: tuple of header lines and MinCurvSurvey
+        """
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """
+        change the size bound of the cache
+
+        :param maxsize: maximum number of cached surveys, 0: caching disabled
+        """
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        drop all cached surveys
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+SURVEYCACHE = SurveyCache()
+"""process-wide survey cache used by :class:`TransformBoreHoleSurvey`"""
 
 
 class TransformBoreHoleSurvey(object):
@@ -246,11 +791,24 @@ def __init__(self, **kwargs):
         kwargs.setdefault('relativeCoords', True)
         kwargs.setdefault('origin', (0.0, 0.0, 0.0))
         kwargs.setdefault('verbose', False)
+        kwargs.setdefault('cachedir', None)
+        kwargs.setdefault('formats_out', None)
+        kwargs.setdefault('compression_out', None)
+        # output file format: 'csv' text or 'binary' columnar table (see fileio.BHReaderWriter.write_binary)
+        kwargs.setdefault('output_format', 'csv')
+        # pre-read (MD, INCL, AZIM) columns, e.g. split from a combined survey table, replacing filename_in
+        kwargs.setdefault('survey_data', None)
+        # share surveys computed from the same file through the process-wide SURVEYCACHE
+        kwargs.setdefault('survey_cache', True)
+        # sidetrack: TransformBoreHoleSurvey of the parent well and kick-off MD, the trajectory above the kick-off
+        # is shared with the parent and only the branch below is calculated
+        kwargs.setdefault('parent', None)
+        kwargs.setdefault('kickoff', None)
         # ###########Variables
         self.wellname = kwargs['wellname']
         self.datadir = kwargs['datadir']
         # catching an empty input survey filename
-        if kwargs['filename_in'] == 'sample-borehole.txt':
+        if kwargs['survey_data'] is None and kwargs['filename_in'] == 'sample-borehole.txt':
             print('Warning: Using default deviation survey')
         self.filename_in = kwargs['filename_in']
         # interpolate in different modes
@@ -266,23 +824,42 @@ def __init__(self, **kwargs):
             print('Warning: Using default surface unit [ft]')
             self.surfunit = 'ft'
         self.interpolation_interval = kwargs['interval']
+        # per column format specifications of the output file, None: defaults of the output mode
+        self.formats_out = kwargs['formats_out']
+        # compression of output files ('gz', 'bz2', 'xz'), None: plain text
+        self.compression_out = kwargs['compression_out']
+        if kwargs['output_format'] not in ('csv', 'binary'):
+            print('Warning: Unknown output format, using csv')
+            kwargs['output_format'] = 'csv'
+        self.output_format = kwargs['output_format']
         self.verbose = kwargs['verbose']
+        self.parent = kwargs['parent']
+        self.kickoff = kwargs['kickoff']
+        if self.parent is not None:
+            self.check_tie_in()
         
-        # MD/INCL/AZIM columns in input file
+        # survey stations and min. curvature parameters are held column-wise by the engine, which is shared
+        # read-only with other instances if taken from the survey cache
+        self.survey = None
+        self.survey_shared = False
+        # MD/INCL/AZIM columns in input file read in a single pass together with the header
         try:
             # generate reader object and check file for existence
             self.reader = fileio.BHReaderWriter(**kwargs)
-            self.reader.read_head()
+            header, self.survey = self.load_survey(kwargs['survey_data'], kwargs['survey_cache'])
         except FileNotFoundError:
                 print('Exception: Deviation survey file not found - using default deviation survey')
                 kwargs['filename_in'] = 'sample-borehole.txt'
                 self.reader = fileio.BHReaderWriter(**kwargs)
+                header, self.survey = self.load_survey(None, kwargs['survey_cache'])
+        except ValueError as err:
+            print('Exception: Error during conversion of survey data\n', err.args)
+            sys.exit(1)
         
         # for blank wells try parsing well name from deviation file header
         if self.wellname == 'UNKNOWN':
             # join the original list of strings back together and match by regular expression
-            lines = self.reader.read_head()
-            for line in lines:
+            for line in header:
                 res_match = match(r"(?i)well:\s*(\S*?),", line)
                 if res_match:
                     self.wellname = res_match.group(1)
@@ -297,197 +874,364 @@ def __init__(self, **kwargs):
         else:
             self.relativeCoords = True
             self.origin = (0.0, 0.0, 0.0)
+        # sidetracks share the well head of their parent
+        if self.parent is not None and tuple(self.origin) != tuple(self.parent.origin):
+            print('Warning: Sidetrack {0:s} uses the well head of its parent well {1:s}'.format(self.wellname,
+                                                                                               self.parent.wellname))
+            self.relativeCoords = self.parent.relativeCoords
+            self.origin = self.parent.origin
 
         # ###########Main
-        self.survey_points = []
-        self.curve_pairs = []
         self.interpolation_points = []
-        self.cartesian_points = []
-        
-        # load, convert, setup data for calculations
-        lines = self.reader.read_data()
-        try:
-            first = float(lines[0][0]) 
-            # check first depth value to be non-negative
-            if first < 0.0:
-                raise ValueError('Exception: first MD value is negative')
-            # check first depth value to be at KB or add surface point
-            elif first >= 0.0001:
-                self.survey_points.append(CLPoint(0.0, 0.0, 0.0))
-                print('Warning: Adding surface point to survey data')
-        except ValueError as err:
-            print('Exception: Error during conversion of survey data\n', err.args)
-            sys.exit(1)
-        prev = -1
-        for line in lines:
-            try:
-                # convert data to numbers and check for depth-sorting
-                line = [float(i) for i in line]
-                md = line[0]
-                if md < prev:
-                    raise ValueError('Exception: MD values are not ascending')
-                prev = md
-                self.survey_points.append(CLPoint(*line))
-            except ValueError as err:
-                print('Exception: Error during conversion of survey data\n', err.args)
-                sys.exit(1)
-        self.setup_min_curv_pairs(self.survey_points)
+        # computed output products keyed by mode, interpolation interval and units
+        self.output_cache = dict()
+        if self.verbose:
+            print('Number of MinCurv pairs generated: ', len(self.survey) - 1)
 
         # calculate and optionally output
         self.generate_output(self.mode)
-        
+
+    def check_tie_in(self):
+        """
+        check the kick-off of a sidetrack against the trajectory of its parent well
+        """
+        if self.kickoff is None:
+            raise ValueError('Exception: Sidetrack requires a kick-off MD on its parent well')
+        if self.depthunit != self.parent.depthunit:
+            raise ValueError('Exception: Sidetrack and parent well differ in depth unit')
+        top, bottom = self.parent.get_md_range()
+        if not top <= self.kickoff <= bottom:
+            raise ValueError('Exception: Kick-off MD {0:.2f} outside of parent well {1:s}'.format(self.kickoff,
+                                                                                                self.parent.wellname))
+
+    def load_survey(self, survey_data=None, use_cache=True):
+        """
+        read the deviation survey file and calculate its min. curvature parameters, surveys of files are taken
+        from or stored in the process-wide SURVEYCACHE, sidetracks keep the branch below the kick-off only
+
+        :param survey_data: pre-read (MD, INCL, AZIM) columns replacing the file, Default ``None``: read file
+        :param use_cache: share the survey through the survey cache
+        :return: tuple of header lines (list of str) and MinCurvSurvey instance
+        """
+        key = None
+        if survey_data is None:
+            if use_cache and self.parent is None and SURVEYCACHE.maxsize > 0:
+                key = SURVEYCACHE.get_key(self.reader)
+                entry = SURVEYCACHE.get(key)
+                if entry is not None:
+                    self.survey_shared = True
+                    if self.verbose:
+                        print('Using cached survey: ' + self.reader.filein)
+                    return entry
+            header, columns = self.reader.read_columns()
+        else:
+            header, columns = [], survey_data
+        # load, convert, setup data for calculations
+        mds = array('d')
+        incls = array('d')
+        azims = array('d')
+        stations = iter_survey_stations(zip(*columns))
+        tiein = (0.0, 0.0, 0.0)
+        if self.parent is not None:
+            # stations down to the kick-off repeat the parent survey, the branch starts at the tie-in station
+            # interpolated on the parent trajectory
+            parent_survey = self.parent.get_survey_at(self.kickoff)
+            point = parent_survey.interpolate_point(self.kickoff)
+            tiein = parent_survey.interpolate_position(self.kickoff)
+            mds.append(self.kickoff)
+            incls.append(math.degrees(point.incl))
+            azims.append(math.degrees(point.azim))
+            stations = (station for station in stations if station[0] > self.kickoff)
+            if self.verbose:
+                print('Sidetrack tie-in on well {0:s} - {1:s}'.format(self.parent.wellname, str(point)))
+        for md, incl, azim in stations:
+            mds.append(md)
+            incls.append(incl)
+            azims.append(azim)
+        survey = MinCurvSurvey(mds, incls, azims, tiein=tiein)
+        if key is not None:
+            SURVEYCACHE.put(key, (header, survey))
+            self.survey_shared = True
+        return header, survey
+
+    def append_station(self, md, incl, azim):
+        """
+        extend the survey by a new station, e.g. from a real-time feed while drilling, updating min. curvature
+        pairs and the running position incrementally, sidetracks of the well are not invalidated: their kick-off
+        lies within the survey and stations are only appended below the last one, i.e. the trajectory above
+        the kick-off, which is all a sidetrack refers to, does not change
+
+        :param md: measured depth in length units, needs to be larger than the last MD of the survey
+        :param incl: borehole inclination measured from vertical [deg]
+        :param azim: borehole azimuth measured from grid North [deg]
+        :return: CartPoint of the new station
+        """
+        if self.survey_shared:
+            # copy on write, cached surveys are shared read-only
+            self.survey = MinCurvSurvey(self.survey.md, self.survey.incl, self.survey.azim, degrees=False,
+                                        tiein=self.survey.tiein)
+            self.survey_shared = False
+        self.survey.append_station(md, incl, azim)
+        self.invalidate_cache()
+        if self.verbose:
+            print('Station appended - ' + str(self.survey.get_point(-1)))
+        return self.get_cartesian_point(-1)
+
+    def get_cartesian_point(self, index=-1):
+        """
+        Cartesian position of a single survey station applying origin and surface unit scaling
+
+        :param index: station index, Default: last station
+        :return: CartPoint instance
+        """
+        scaler = self.get_surface_scaler()
+        return CartPoint(self.origin[0] + self.survey.north[index] * scaler,
+                         self.origin[1] + self.survey.east[index] * scaler,
+                         -self.origin[2] + self.survey.tvd[index])
+
+    def calculate_cart_points(self, mdepths):
+        """
+        Cartesian positions at a sequence of measured depths evaluated in closed form on the arcs of the
+        original survey, depths outside of the survey are clamped
+
+        :param mdepths: sequence of measured depths in length units
+        :return: list of CartPoint instances in the order of mdepths
+        """
+        minimum, maximum = self.get_md_range()
+        scaler = self.get_surface_scaler()
+        orign, orige, origv = self.origin[0], self.origin[1], -self.origin[2]
+        points = []
+        for mdepth in mdepths:
+            mdepth = min(max(mdepth, minimum), maximum)
+            north, east, tvd = self.get_survey_at(mdepth).interpolate_position(mdepth)
+            points.append(CartPoint(orign + north * scaler, orige + east * scaler, origv + tvd))
+        return points
+
+    def calculate_mds_at_tvds(self, tvds):
+        """
+        inverse lookup of measured depths at a sequence of vertical positions, e.g. horizons, fluid contacts
+        or casing points
+
+        :param tvds: sequence of Z(TVD) values in the vertical reference of the Cartesian output
+        :return: list of lists of MD values, an empty list if the borehole does not reach the TVD
+        """
+        return [self.get_mds_at_tvd(tvd + self.origin[2]) for tvd in tvds]
+
+    def get_mds_at_tvd(self, tvd):
+        """
+        inverse lookup along the trajectory, sidetracks include the crossings of their parent above the kick-off
+
+        :param tvd: TVD relative to the tie-in reference in depth units
+        :return: list of MD values sorted by depth
+        """
+        mds = self.survey.mds_at_tvd(tvd)
+        if self.parent is not None:
+            mds = [mdepth for mdepth in self.parent.get_mds_at_tvd(tvd) if mdepth < self.kickoff] + mds
+        return mds
+
+    def get_md_range(self):
+        """
+        :return: tuple of first and last MD of the trajectory, sidetracks start at the first MD of their parent
+        """
+        if self.parent is not None:
+            return self.parent.get_md_range()[0], self.survey.md[-1]
+        return self.survey.md[0], self.survey.md[-1]
+
+    def get_survey_at(self, mdepth):
+        """
+        :param mdepth: measured depth in length units
+        :return: MinCurvSurvey holding a measured depth, depths above the kick-off of a sidetrack resolve to the
+                 (shared) survey of the parent well
+        """
+        if self.parent is not None and mdepth < self.kickoff:
+            return self.parent.get_survey_at(mdepth)
+        return self.survey
+
+    def get_station_mds(self):
+        """
+        :return: list of MD values of the survey stations along the trajectory, sidetracks include the stations
+                 of their parent above the kick-off
+        """
+        mds = list(self.survey.md)
+        if self.parent is not None:
+            mds = [mdepth for mdepth in self.parent.get_station_mds() if mdepth < self.kickoff] + mds
+        return mds
+
+    def calculate_md_at_tvd(self, tvd):
+        """
+        inverse lookup of the first measured depth at a vertical position, see :meth:`calculate_mds_at_tvds`
+
+        :param tvd: Z(TVD) value in the vertical reference of the Cartesian output
+        :return: MD value or None if the borehole does not reach the TVD
+        """
+        mds = self.calculate_mds_at_tvds((tvd,))[0]
+        return mds[0] if mds else None
+
+    def calculate_cart_point(self, mdepth):
+        """
+        Cartesian position at a measured depth, see :meth:`calculate_cart_points`
+
+        :param mdepth: measured depth in length units
+        :return: CartPoint instance
+        """
+        return self.calculate_cart_points((mdepth,))[0]
+
+    @property
+    def survey_points(self):
+        """
+        :return: list of CLPoint views of the survey stations
+        """
+        return self.survey.get_points()
+
+    @property
+    def curve_pairs(self):
+        """
+        :return: list of MinCurvPair views of consecutive survey stations
+        """
+        return self.survey.get_pairs()
+
+    @property
+    def cartesian_points(self):
+        """
+        :return: list of CartPoint instances of the survey stations read from the cumulative positions of the
+                 engine applying origin and surface unit scaling
+        """
+        scaler = self.get_surface_scaler()
+        orign, orige, origv = self.origin[0], self.origin[1], -self.origin[2]
+        return [CartPoint(orign + north * scaler, orige + east * scaler, origv + tvd)
+                for north, east, tvd in zip(self.survey.north, self.survey.east, self.survey.tvd)]
+
     def generate_output(self, mode=0):
         """
 
         :param mode:
         """
         if 0 < mode < 4:
-            # generate Cartesian coordinate file from original curvelinear coordinate file
-            pointlist = []
-            outheader = ''
-            wellnote = 'Well: ' + self.wellname
-            filename_out = 'out_' + self.wellname
-            if mode == 1:
-                self.cartesian_points = []
-                self.build_cartesian_points()
-                filename_out += '_borehole_cart_orig.txt'
-                if self.relativeCoords:
-                    outheader = (wellnote, 'dX(N) ['+self.surfunit+']', 'dY(E) ['+self.surfunit+']',
-                                 'dZ(TVD) ['+self.depthunit+']')
-                else:
-                    outheader = (wellnote, 'X(N) ['+self.surfunit+']', 'Y(E) ['+self.surfunit+']',
-                                 'Z(TVD) ['+self.depthunit+']')
-                pointlist = self.cartesian_points
-#               for row in self.cartesian_points:
-#                  print(row)
-            # generate interpolation points and output curvelinear coordinate file
-            elif mode == 2:
-                self.interpolation_points = []
-                self.setup_cl_points()
-                self.interpolate_cl_points()
-                filename_out += '_borehole_curve_inter.txt'
-                outheader = (wellnote, 'MD ['+self.depthunit+']', 'INCL [deg]', 'AZIM [deg]')
-                pointlist = self.interpolation_points
-            
-            # generate and output Cartesian coordinate file from interpolated data
-            elif mode == 3:
-                self.interpolation_points = []
-                self.setup_cl_points()
-                self.interpolate_cl_points()
-                self.curve_pairs = []
-                self.setup_min_curv_pairs(self.interpolation_points)
-                self.cartesian_points = []
-                self.build_cartesian_points()
-                filename_out += '_borehole_cart_inter.txt'
-                if self.relativeCoords:
-                    outheader = (wellnote, 'dX(N) ['+self.surfunit+']', 'dY(E) ['+self.surfunit+']',
-                                 'dZ(TVD) ['+self.depthunit+']')
-                else:
-                    outheader = (wellnote, 'X(N) ['+self.surfunit+']', 'Y(E) ['+self.surfunit+']',
-                                 'Z(TVD) ['+self.depthunit+']')
-                pointlist = self.cartesian_points
-#               for row in self.cartesian_points:
-#                   print(row)
-            outdata = []
-            for item in pointlist:
-                outdata.append(item.output_list())
-            outargs = {'datadir': self.datadir, 'filename_out': filename_out,
-                       'header_out': outheader, 'data_out': outdata, 'verbose': self.verbose}
-            writer = fileio.BHReaderWriter(**outargs)
-            writer.write_data()
+            # 1: Cartesian coordinates from original curvelinear coordinates
+            # 2: interpolated curvelinear coordinates
+            # 3: Cartesian coordinates from interpolated data
+            pointlist = self.get_output_points(mode)
+            filename_out, outheader = get_output_header(mode, self.wellname, self.depthunit, self.surfunit,
+                                                        self.relativeCoords)
+            if self.output_format == 'binary':
+                # typed columns with well name and units in the schema of the table
+                filename_out = filename_out[:-len('.txt')] + '.bht'
+                columns = [array('d') for _ in outheader[1:]]
+                for item in pointlist:
+                    for column, value in zip(columns, item.output_values()):
+                        column.append(value)
+                metadata = {'wellname': self.wellname, 'mode': mode, 'depthunit': self.depthunit,
+                            'surfaceunit': self.surfunit, 'relativeCoords': self.relativeCoords}
+                writer = fileio.BHReaderWriter(datadir=self.datadir, filename_out=filename_out, verbose=self.verbose)
+                writer.write_binary(columns, outheader[1:], metadata)
+            else:
+                # rows are formatted in chunks by a precompiled template while being written
+                outargs = {'datadir': self.datadir, 'filename_out': filename_out, 'header_out': outheader,
+                           'formats_out': get_output_formats(mode, self.formats_out),
+                           'compression_out': self.compression_out, 'verbose': self.verbose}
+                writer = fileio.BHReaderWriter(**outargs)
+                writer.write_rows(item.output_values() for item in pointlist)
         else:
             print('No output file generated')
 
-    def setup_min_curv_pairs(self, clpoints):
+    def get_output_points(self, mode):
         """
-        build list of curve pairs and calculate min. curvature parameters
+        calculate the points of an output product once and serve repeated requests from the cache,
+        the original survey is left untouched by all products
 
-        :param clpoints:
+        :param mode: 1: original Cartesian, 2: interpolated curvelinear, 3: interpolated Cartesian coordinates
+        :return: list of CartPoint (mode 1/3) or CLPoint (mode 2) instances
         """
-        for pairs in zip(clpoints[0:-1], clpoints[1:]):
-            # print(pairs[0],'\n',pairs[1],'\n')
-            self.curve_pairs.append(MinCurvPair(pairs[0], pairs[1]))
-        if self.verbose:
-            print('Number of MinCurv pairs generated: ', len(self.curve_pairs))
-            for pair in self.curve_pairs:
-                print(pair)
+        units = (self.depthunit, self.surfunit, tuple(self.origin))
+        if mode == 1:
+            key = (mode, None) + units
+        elif mode == 2:
+            key = (mode, self.interpolation_interval)
+        else:
+            key = (mode, self.interpolation_interval) + units
+        if key in self.output_cache:
+            if self.verbose:
+                print('Using cached output points for mode {0:d}'.format(mode))
+            return self.output_cache[key]
+        if mode == 1:
+            points = self.cartesian_points
+            if self.verbose:
+                print('Number of Cartesian points generated: ', len(points))
+            if self.parent is not None:
+                # stations of the parent above the kick-off complete the trajectory of a sidetrack
+                points = self.calculate_cart_points(self.get_station_mds()[:-len(self.survey)]) + points
+        elif mode == 2:
+            self.interpolation_points = []
+            self.setup_cl_points()
+            self.interpolate_cl_points()
+            points = self.interpolation_points
+        else:
+            # positions are evaluated directly on the arcs of the original survey
+            points = self.calculate_cart_points(self.get_interpolation_mds())
+        self.output_cache[key] = points
+        return points
 
-    def build_cartesian_points(self):
+    def __getstate__(self):
         """
+        pickle support (snapshots, worker processes) without the cached output products, which are recalculated
+        on demand
 
+        :return: dictionary of instance attributes
         """
-        current = CartPoint(self.origin[0], self.origin[1], -self.origin[2])
-        self.cartesian_points.append(current)
-        if self.depthunit == self.surfunit:
-            scaler = 1.0
-        elif self.depthunit == 'ft':
-            scaler = .3048
-        # unlikely case
-        else:
-            scaler = 1/.3048
-        for curvepair in self.curve_pairs:
-            delta = self.calculate_cartesian_deltas(curvepair)
-            delta.scale_xy(scaler)
-            current += delta
-            self.cartesian_points.append(current)
+        state = self.__dict__.copy()
+        state['output_cache'] = dict()
+        state['interpolation_points'] = []
+        return state
 
-    def calculate_cartesian_deltas(self, pair):
+    def invalidate_cache(self):
         """
+        drop all cached output products, required whenever the survey is modified
+        """
+        self.output_cache = dict()
 
-        :param pair:
-        :return:
+    def get_surface_scaler(self):
         """
-        dx = math.sin(pair.pA.incl) * math.cos(pair.pA.azim) + math.sin(pair.pB.incl) * math.cos(pair.pB.azim)
-        dy = math.sin(pair.pA.incl) * math.sin(pair.pA.azim) + math.sin(pair.pB.incl) * math.sin(pair.pB.azim)
-        dz = math.cos(pair.pA.incl) + math.cos(pair.pB.incl)
-        deltas = CartPoint(dx, dy, dz)
-        scaler = pair.deltaMD * pair.shapefactor / 2.0
-        deltas.scale(scaler)
-        if self.verbose:
-            print(deltas)
-        return deltas
+        :return: scaling factor converting horizontal lengths from depth units to surface units
+        """
+        return get_surface_scaler(self.depthunit, self.surfunit)
 
-    def setup_cl_points(self):
+    def get_interpolation_mds(self):
         """
+        evenly-spaced measured depths along the survey using the interpolation interval
 
+        :return: array of MD values including first and last survey point
         """
-        # build list of interpolation points and fill with MD values
-        min_depth = self.survey_points[0].md
-        max_depth = self.survey_points[-1].md
+        min_depth, max_depth = self.get_md_range()
         # integer division - number of flagpoles
         points = int((max_depth - min_depth) // self.interpolation_interval) + 1
-        for point in range(points):
-            self.interpolation_points.append(CLPoint(min_depth + self.interpolation_interval * point, 0.0, 0.0))
+        mds = array('d', (min_depth + self.interpolation_interval * point for point in range(points)))
         # check for sampling interval without overlap or add last survey point
         residual = (max_depth - min_depth) % self.interpolation_interval
         if residual > 0.001:
-            self.interpolation_points.append(CLPoint(max_depth, 0.0, 0.0))
+            mds.append(max_depth)
         if self.verbose:
             print('MinDepth: ', min_depth)
             print('MaxDepth: ', max_depth)
             print('Interval:', self.interpolation_interval)
             print('Evenly-Spaced Points: ', points)
             print('Residual: ', residual)
-            print('Number of interpolation points: ', len(self.interpolation_points))
+            print('Number of interpolation points: ', len(mds))
+        return mds
+
+    def setup_cl_points(self):
+        """
+        build list of interpolation points and fill with MD values
+        """
+        for mdepth in self.get_interpolation_mds():
+            self.interpolation_points.append(CLPoint(mdepth, 0.0, 0.0))
     
     def interpolate_cl_points(self):
         """
 
         """
-        dataiter = iter(self.curve_pairs)
-        # point iterator to first MinCurvPair
-        curvepair = next(dataiter)
         # loop over all interpolation points
         for index, ipoint in enumerate(self.interpolation_points):
-            # move to MinCurvPair containing the interpolation point
-            while ipoint.md > curvepair.pB.md: 
-                curvepair = next(dataiter)
-            idepth = ipoint.md-curvepair.pA.md
-            self.interpolation_points[index] = curvepair.calc_interpolation_md(idepth)
-            if self.verbose:
-                print('Interval {0:8.2f} to {1:8.2f} used to interpolate point {2:8.2f}'.format(curvepair.pA.md,
-                                                                                                curvepair.pB.md,
-                                                                                                ipoint.md))
+            self.interpolation_points[index] = self._interpolate_at(ipoint.md)
         if self.verbose:
             print('RESULT:\n')
             for point in self.interpolation_points:
@@ -495,24 +1239,54 @@ def interpolate_cl_points(self):
 
     def calculate_cl_point(self, mdepth):
         """
+        interpolate a curvelinear point at a measured depth, depths outside of the survey are clamped
 
-        :param mdepth:
-        :return:
+        :param mdepth: measured depth in length units
+        :return: CLPoint instance
         """
-        minimum = self.curve_pairs[0].pA.md
-        maximum = self.curve_pairs[-1].pB.md
+        minimum, maximum = self.get_md_range()
         if mdepth < minimum:
             mdepth = minimum
             print('Warning: Depth extrapolation beyond well data was shortened')
         if mdepth > maximum:
             mdepth = maximum
             print('Warning: Depth extrapolation beyond well data was shortened')
-        dataiter = iter(self.curve_pairs)
-        # point iterator to first MinCurvPair
-        curvepair = next(dataiter)
-        # move to MinCurvPair containing the interpolation point
-        while mdepth > curvepair.pB.md:
-            curvepair = next(dataiter)
+        return self._interpolate_at(mdepth)
+
+    def calculate_cl_points(self, mdepths):
+        """
+        batch version of :meth:`calculate_cl_point` resolving a sequence of measured depths in arbitrary order
+        by bisection of the MD index, depths outside of the survey are clamped
+
+        :param mdepths: sequence of measured depths in length units
+        :return: list of CLPoint instances in the order of mdepths
+        """
+        minimum, maximum = self.get_md_range()
+        points = []
+        clamped = 0
+        for mdepth in mdepths:
+            if mdepth < minimum:
+                mdepth = minimum
+                clamped += 1
+            elif mdepth > maximum:
+                mdepth = maximum
+                clamped += 1
+            points.append(self._interpolate_at(mdepth))
+        if clamped:
+            print('Warning: Depth extrapolation beyond well data was shortened for {0:d} points'.format(clamped))
+        return points
+
+    def _interpolate_at(self, mdepth):
+        """
+        locate the MinCurvPair containing a measured depth by bisection and interpolate a curvelinear point
+
+        :param mdepth: measured depth within the survey
+        :return: CLPoint instance
+        """
+        survey = self.get_survey_at(mdepth)
+        if len(survey) < 2:
+            return survey.interpolate_point(mdepth)
+        curvepair = survey.get_pair(survey.locate(mdepth))
         idepth = mdepth-curvepair.pA.md
         point = curvepair.calc_interpolation_md(idepth)
         if self.verbose:
@@ -523,6 +1297,158 @@ def calculate_cl_point(self, mdepth):
         return point
                 
 
+class StreamBoreHoleSurvey(object):
+    """
+    streaming counterpart of :class:`TransformBoreHoleSurvey` converting a deviation survey file into an output
+    file by a chain of generators (station parsing, pair calculation, interpolation, formatting, writing),
+    so that memory consumption does not depend on the survey length or the interpolation interval
+    """
+    def __init__(self, **kwargs):
+        """
+        sets class parameters based on external keywords and / or robust defaults and generates the output
+
+        :param kwargs: unpacked keyword dictionary, same keywords as :class:`TransformBoreHoleSurvey`
+        """
+        kwargs.setdefault('wellname', 'UNKNOWN')
+        kwargs.setdefault('datadir', 'data')
+        kwargs.setdefault('filename_in', 'sample-borehole.txt')
+        kwargs.setdefault('headerlines_in', 1)
+        kwargs.setdefault('columns_in', (1, 2, 3))
+        kwargs.setdefault('mode', 1)
+        kwargs.setdefault('depthunit', 'ft')
+        kwargs.setdefault('surfaceunit', 'ft')
+        kwargs.setdefault('interval', 50.0)
+        kwargs.setdefault('relativeCoords', True)
+        kwargs.setdefault('origin', (0.0, 0.0, 0.0))
+        kwargs.setdefault('verbose', False)
+        kwargs.setdefault('formats_out', None)
+        kwargs.setdefault('compression_out', None)
+        # ###########Variables
+        self.wellname = kwargs['wellname']
+        self.datadir = kwargs['datadir']
+        self.mode = kwargs['mode']
+        if kwargs['depthunit'] in ('ft', 'm'):
+            self.depthunit = kwargs['depthunit']
+        else:
+            print('Warning: Using default vertical unit [ft]')
+            self.depthunit = 'ft'
+        if kwargs['surfaceunit'] in ('ft', 'm'):
+            self.surfunit = kwargs['surfaceunit']
+        else:
+            print('Warning: Using default surface unit [ft]')
+            self.surfunit = 'ft'
+        self.interpolation_interval = kwargs['interval']
+        self.formats_out = kwargs['formats_out']
+        self.compression_out = kwargs['compression_out']
+        self.verbose = kwargs['verbose']
+        self.reader = fileio.BHReaderWriter(**kwargs)
+        # for blank wells try parsing well name from deviation file header
+        if self.wellname == 'UNKNOWN':
+            for line in self.reader.read_head():
+                res_match = match(r"(?i)well:\s*(\S*?),", line)
+                if res_match:
+                    self.wellname = res_match.group(1)
+                    print('Reading well name from file successful: {0:s}'.format(self.wellname))
+        # output absolute or relative Cartesian coordinates
+        self.relativeCoords = bool(kwargs['relativeCoords'])
+        self.origin = (0.0, 0.0, 0.0) if self.relativeCoords else kwargs['origin']
+        if len(self.origin) != 3:
+            raise ValueError('Exception: Borehole origin in wrong format - needs to be (X(N), Y(E), Z(TVD))')
+
+        # ###########Main
+        self.generate_output(self.mode)
+
+    def generate_output(self, mode=1):
+        """
+        stream the survey file through the generator chain of a conversion mode into an output file
+
+        :param mode: 1: original Cartesian, 2: interpolated curvelinear, 3: interpolated Cartesian coordinates
+        """
+        if 0 < mode < 4:
+            pairs = self.iter_pairs(self.iter_stations())
+            if mode == 1:
+                points = self.iter_cartesian_points(pairs)
+            elif mode == 2:
+                points = (pair.calc_interpolation_md(depth) for pair, _, depth in self.iter_interpolation(pairs))
+            else:
+                points = (self.to_cart_point(position + pair.calc_interpolation_delta(depth))
+                          for pair, position, depth in self.iter_interpolation(pairs))
+            filename_out, outheader = get_output_header(mode, self.wellname, self.depthunit, self.surfunit,
+                                                        self.relativeCoords)
+            outargs = {'datadir': self.datadir, 'filename_out': filename_out, 'header_out': outheader,
+                       'formats_out': get_output_formats(mode, self.formats_out),
+                       'compression_out': self.compression_out, 'verbose': self.verbose}
+            writer = fileio.BHReaderWriter(**outargs)
+            writer.write_rows(point.output_values() for point in points)
+        else:
+            print('No output file generated')
+
+    def iter_stations(self):
+        """
+        :return: generator of CLPoint instances parsed from the survey file
+        """
+        return (CLPoint(*station) for station in iter_survey_stations(self.reader.iter_data()))
+
+    @staticmethod
+    def iter_pairs(points):
+        """
+        :param points: iterable of CLPoint instances sorted by MD
+        :return: generator of MinCurvPair instances of consecutive points
+        """
+        previous = None
+        for point in points:
+            if previous is not None:
+                yield MinCurvPair(previous, point)
+            previous = point
+
+    def iter_cartesian_points(self, pairs):
+        """
+        :param pairs: iterable of MinCurvPair instances
+        :return: generator of CartPoint instances of all stations using a running position
+        """
+        position = CartPoint(0.0, 0.0, 0.0)
+        yield self.to_cart_point(position)
+        for pair in pairs:
+            position += pair.calc_interpolation_delta(pair.deltaMD)
+            yield self.to_cart_point(position)
+
+    def iter_interpolation(self, pairs):
+        """
+        walk through the pairs and locate evenly-spaced interpolation depths including the last survey point
+
+        :param pairs: iterable of MinCurvPair instances
+        :return: generator of tuples of MinCurvPair, position of its first point (depth units) and depth below it
+        """
+        interval = self.interpolation_interval
+        position = CartPoint(0.0, 0.0, 0.0)
+        min_depth = None
+        count = 0
+        pair = None
+        upper = position
+        for pair in pairs:
+            if min_depth is None:
+                min_depth = pair.pA.md
+            upper = position
+            # integer division - number of flagpoles up to the end of the pair
+            last = int((pair.pB.md - min_depth) // interval)
+            while count <= last:
+                yield pair, upper, min_depth + interval * count - pair.pA.md
+                count += 1
+            position = upper + pair.calc_interpolation_delta(pair.deltaMD)
+        # check for sampling interval without overlap or add last survey point
+        if pair is not None and (pair.pB.md - min_depth) % interval > 0.001:
+            yield pair, upper, pair.deltaMD
+
+    def to_cart_point(self, position):
+        """
+        :param position: CartPoint relative to the first station in depth units
+        :return: CartPoint applying origin and surface unit scaling
+        """
+        scaler = get_surface_scaler(self.depthunit, self.surfunit)
+        return CartPoint(self.origin[0] + position.x * scaler, self.origin[1] + position.y * scaler,
+                         -self.origin[2] + position.z)
+
+
 if __name__ == '__main__':                  # call test environment only if module is called standalone
     TWIDTH = 79                               # terminal width excluding EOL
     print(TWIDTH*'=')
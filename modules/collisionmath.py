@@ -0,0 +1,433 @@
+#!/usr/bin/python #Linux shebang plus chmod to make executable
+# ------------------------------------------------------------
+# FILENAME: collisionmath.py
+# VERSION: 1.0 - Python 3.6
+# PURPOSE:
+# AUTHOR: MVS
+# LAST CHANGE: 17/10/2026
+# ------------------------------------------------------------
+# tools for anti-collision analysis between well trajectories
+
+
+import math
+import multiprocessing
+from array import array
+from bisect import bisect_right
+
+from modules import fileio
+
+
+def calc_segment_distance(pointa0, pointa1, pointb0, pointb1):
+    """
+    closest approach between two straight line segments in 3D
+
+    :param pointa0: start point (x, y, z) of first segment
+    :param pointa1: end point (x, y, z) of first segment
+    :param pointb0: start point (x, y, z) of second segment
+    :param pointb1: end point (x, y, z) of second segment
+    :return: tuple of distance and segment parameters (0...1) of the closest points on first and second segment
+    """
+    da = [pointa1[i] - pointa0[i] for i in range(3)]
+    db = [pointb1[i] - pointb0[i] for i in range(3)]
+    r = [pointa0[i] - pointb0[i] for i in range(3)]
+    aa = da[0] * da[0] + da[1] * da[1] + da[2] * da[2]
+    bb = db[0] * db[0] + db[1] * db[1] + db[2] * db[2]
+    br = db[0] * r[0] + db[1] * r[1] + db[2] * r[2]
+    if aa <= 1e-12 and bb <= 1e-12:
+        # both segments degenerate to points
+        s = t = 0.0
+    elif aa <= 1e-12:
+        s = 0.0
+        t = min(max(br / bb, 0.0), 1.0)
+    else:
+        ar = da[0] * r[0] + da[1] * r[1] + da[2] * r[2]
+        if bb <= 1e-12:
+            t = 0.0
+            s = min(max(-ar / aa, 0.0), 1.0)
+        else:
+            ab = da[0] * db[0] + da[1] * db[1] + da[2] * db[2]
+            denom = aa * bb - ab * ab
+            # parallel segments: pick arbitrary s
+            s = min(max((ab * br - ar * bb) / denom, 0.0), 1.0) if denom > 1e-12 else 0.0
+            t = (ab * s + br) / bb
+            if t < 0.0:
+                t = 0.0
+                s = min(max(-ar / aa, 0.0), 1.0)
+            elif t > 1.0:
+                t = 1.0
+                s = min(max((ab - ar) / aa, 0.0), 1.0)
+    dist = [r[i] + da[i] * s - db[i] * t for i in range(3)]
+    return math.sqrt(dist[0] * dist[0] + dist[1] * dist[1] + dist[2] * dist[2]), s, t
+
+
+def get_trajectory(geometry, resolution=30.0):
+    """
+    sample a well trajectory along its min. curvature arcs into a polyline of absolute Cartesian points,
+    vertical positions are converted to surface units to obtain consistent distances, sidetracks are sampled
+    including the hole shared with their parent well
+
+    :param geometry: TransformBoreHoleSurvey instance
+    :param resolution: maximum MD step between consecutive polyline points
+    :return: tuple of arrays (MD, X(N), Y(E), Z(TVD))
+    """
+    stations = geometry.get_station_mds()
+    mds = array('d')
+    for index in range(len(stations) - 1):
+        top = stations[index]
+        steps = max(int(math.ceil((stations[index + 1] - top) / resolution)), 1)
+        step = (stations[index + 1] - top) / steps
+        mds.extend(top + step * count for count in range(steps))
+    mds.append(stations[-1])
+    scaler = geometry.get_surface_scaler()
+    xs = array('d')
+    ys = array('d')
+    zs = array('d')
+    for point in geometry.calculate_cart_points(mds):
+        xs.append(point.x)
+        ys.append(point.y)
+        zs.append(point.z * scaler)
+    return mds, xs, ys, zs
+
+
+def clip_trajectory(trajectory, mdepth=None):
+    """
+    drop the part of a sampled trajectory down to a measured depth, e.g. the hole shared by a sidetrack and its
+    parent well
+
+    :param trajectory: tuple of arrays (MD, X(N), Y(E), Z(TVD)) as returned by :func:`get_trajectory`
+    :param mdepth: MD, the clipped trajectory starts at the first point below, Default ``None``: no clipping
+    :return: tuple of arrays (MD, X(N), Y(E), Z(TVD))
+    """
+    if mdepth is None:
+        return trajectory
+    first = bisect_right(trajectory[0], mdepth)
+    return tuple(column[first:] for column in trajectory)
+
+
+class TrajectoryIndex(object):
+    """
+    spatial index of well trajectory segments in a uniform grid of cubic cells for pruned closest-approach
+    (anti-collision) queries between a reference well and all offset wells
+    """
+    def __init__(self, **kwargs):
+        """
+        sets class parameters based on external keywords and / or robust defaults and indexes all wells of an
+        optional well database
+
+        :param kwargs: unpacked keyword dictionary
+        """
+        kwargs.setdefault('welldatabase', None)
+        kwargs.setdefault('cellsize', 100.0)
+        kwargs.setdefault('resolution', 30.0)
+        kwargs.setdefault('verbose', False)
+        # ###########Variables
+        self.cellsize = float(kwargs['cellsize'])
+        self.resolution = float(kwargs['resolution'])
+        self.verbose = kwargs['verbose']
+        # sampled trajectories keyed by well name: (MD, X, Y, Z) arrays
+        self.trajectories = dict()
+        # grid cells keyed by cell indices holding (well name, segment index) tuples
+        self.cells = dict()
+        # sidetracks keyed by well name: (parent well name, kick-off MD)
+        self.tieins = dict()
+        # factors converting MD (depth units) into surface units keyed by well name
+        self.scalers = dict()
+        if kwargs['welldatabase'] is not None:
+            for wellname, well in kwargs['welldatabase'].wells.items():
+                self.add_well(wellname, well.geometry)
+            if self.verbose:
+                print(self)
+
+    def __str__(self):
+        """overloaded string operator"""
+        return 'Wells indexed: {0:d}, grid cells: {1:d}'.format(len(self.trajectories), len(self.cells))
+
+    def _get_cell_range(self, xs, ys, zs, first, last, margin=0.0, cellsize=None):
+        """
+        cell index ranges covering the bounding box of polyline points first...last expanded by a margin
+
+        :return: list of three range objects
+        """
+        if cellsize is None:
+            cellsize = self.cellsize
+        ranges = []
+        for column in (xs, ys, zs):
+            low = min(column[first], column[last]) - margin
+            high = max(column[first], column[last]) + margin
+            ranges.append(range(int(math.floor(low / cellsize)), int(math.floor(high / cellsize)) + 1))
+        return ranges
+
+    def add_well(self, wellname, geometry):
+        """
+        sample a well trajectory and register its segments in all grid cells overlapping their bounding boxes
+
+        :param wellname: unique well name
+        :param geometry: TransformBoreHoleSurvey instance
+        """
+        self.add_trajectory(wellname, get_trajectory(geometry, self.resolution), geometry.get_surface_scaler())
+        if geometry.parent is not None:
+            self.tieins[wellname] = (geometry.parent.wellname, geometry.kickoff)
+
+    def add_trajectory(self, wellname, trajectory, scaler=1.0):
+        """
+        register the segments of a sampled trajectory in all grid cells overlapping their bounding boxes
+
+        :param wellname: unique well name
+        :param trajectory: tuple of arrays (MD, X(N), Y(E), Z(TVD)) as returned by :func:`get_trajectory`
+        :param scaler: factor converting MD into surface units, see TransformBoreHoleSurvey.get_surface_scaler
+        """
+        if wellname in self.trajectories:
+            self.remove_well(wellname)
+        self.trajectories[wellname] = trajectory
+        self.scalers[wellname] = scaler
+        _, xs, ys, zs = trajectory
+        for segment in range(len(xs) - 1):
+            rangex, rangey, rangez = self._get_cell_range(xs, ys, zs, segment, segment + 1)
+            for i in rangex:
+                for j in rangey:
+                    for k in rangez:
+                        self.cells.setdefault((i, j, k), []).append((wellname, segment))
+
+    def remove_well(self, wellname):
+        """
+        :param wellname: well name to be dropped from the index
+        """
+        del self.trajectories[wellname]
+        del self.scalers[wellname]
+        self.tieins.pop(wellname, None)
+        for key in list(self.cells):
+            self.cells[key] = [item for item in self.cells[key] if item[0] != wellname]
+            if not self.cells[key]:
+                del self.cells[key]
+
+    def get_shared_depth(self, wella, wellb):
+        """
+        depth down to which two wells share their hole, i.e. a sidetrack with its parent (or further ancestors)
+        and sidetracks of a common parent
+
+        :param wella: well name
+        :param wellb: well name
+        :return: MD of the shared hole or None for wells without common hole
+        """
+        ancestors = dict()
+        wellname, depth = wella, float('inf')
+        while wellname is not None and wellname not in ancestors:
+            ancestors[wellname] = depth
+            parent, kickoff = self.tieins.get(wellname, (None, depth))
+            wellname, depth = parent, min(depth, kickoff)
+        visited = set()
+        wellname, depth = wellb, float('inf')
+        while wellname is not None and wellname not in visited:
+            if wellname in ancestors:
+                return min(depth, ancestors[wellname])
+            visited.add(wellname)
+            parent, kickoff = self.tieins.get(wellname, (None, depth))
+            wellname, depth = parent, min(depth, kickoff)
+        return None
+
+    def get_candidates(self, ranges):
+        """
+        collect the segments registered in a box of grid cells, for boxes larger than the occupied part of the
+        grid the occupied cells are scanned instead
+
+        :param ranges: list of three cell index ranges
+        :return: set of (well name, segment index) tuples
+        """
+        rangex, rangey, rangez = ranges
+        candidates = set()
+        if len(rangex) * len(rangey) * len(rangez) > len(self.cells):
+            for (i, j, k), items in self.cells.items():
+                if i in rangex and j in rangey and k in rangez:
+                    candidates.update(items)
+        else:
+            for i in rangex:
+                for j in rangey:
+                    for k in rangez:
+                        candidates.update(self.cells.get((i, j, k), ()))
+        return candidates
+
+    def closest_approach(self, reference, radius=1000.0):
+        """
+        minimum centre-to-centre distance between a reference well and every offset well within a search radius,
+        candidate segments are pruned using the grid cells
+
+        :param reference: well name of an indexed well, sampled trajectory tuple or TransformBoreHoleSurvey
+                          instance of e.g. a planned well
+        :param radius: search radius in surface units, offset wells farther away are not reported, wells sharing
+                       their hole with an indexed reference well are compared below the shared depth
+        :return: list of tuples (offset well name, reference MD, offset MD, distance) sorted by distance
+        """
+        if isinstance(reference, str):
+            refname = reference
+            trajectory = self.trajectories[reference]
+        elif isinstance(reference, tuple):
+            refname = None
+            trajectory = reference
+        else:
+            refname = None
+            trajectory = get_trajectory(reference, self.resolution)
+        refmd, refx, refy, refz = trajectory
+        best = dict()
+        shared = dict()
+        for segment in range(len(refx) - 1):
+            pointa0 = (refx[segment], refy[segment], refz[segment])
+            pointa1 = (refx[segment + 1], refy[segment + 1], refz[segment + 1])
+            candidates = self.get_candidates(self._get_cell_range(refx, refy, refz, segment, segment + 1, radius))
+            for wellname, offset in candidates:
+                if wellname == refname:
+                    continue
+                offmd, offx, offy, offz = self.trajectories[wellname]
+                if refname is not None:
+                    if wellname not in shared:
+                        shared[wellname] = self.get_shared_depth(refname, wellname)
+                    # segments starting within the shared hole are identical for both wells
+                    if shared[wellname] is not None and min(refmd[segment], offmd[offset]) <= shared[wellname]:
+                        continue
+                dist, s, t = calc_segment_distance(pointa0, pointa1, (offx[offset], offy[offset], offz[offset]),
+                                                   (offx[offset + 1], offy[offset + 1], offz[offset + 1]))
+                if dist <= radius and (wellname not in best or dist < best[wellname][3]):
+                    best[wellname] = (wellname, refmd[segment] + s * (refmd[segment + 1] - refmd[segment]),
+                                      offmd[offset] + t * (offmd[offset + 1] - offmd[offset]), dist)
+        result = sorted(best.values(), key=lambda x: x[3])
+        if self.verbose:
+            for item in result:
+                print('Offset well: {0:s}, MD ref: {1:10.2f}, MD offset: {2:10.2f}, Distance: {3:10.2f}'.format(
+                    *item))
+        return result
+
+    def get_neighbour_pairs(self, radius=1000.0):
+        """
+        pairs of wells with segments closer than the search radius to each other (plus some farther apart),
+        wells are registered in a coarse grid with cells not smaller than the search radius, so that only the
+        27 cells around each occupied cell need to be visited
+
+        :param radius: search radius in surface units
+        :return: sorted list of tuples of two well names
+        """
+        cellsize = max(radius, self.cellsize)
+        cellwells = dict()
+        for wellname, (_, xs, ys, zs) in self.trajectories.items():
+            for segment in range(len(xs) - 1):
+                rangex, rangey, rangez = self._get_cell_range(xs, ys, zs, segment, segment + 1, cellsize=cellsize)
+                for i in rangex:
+                    for j in rangey:
+                        for k in rangez:
+                            cellwells.setdefault((i, j, k), set()).add(wellname)
+        pairs = set()
+        for (i, j, k), wells in cellwells.items():
+            near = set()
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    for dk in (-1, 0, 1):
+                        near.update(cellwells.get((i + di, j + dj, k + dk), ()))
+            for wella in wells:
+                for wellb in near:
+                    if wella < wellb:
+                        pairs.add((wella, wellb))
+        return sorted(pairs)
+
+    def scan_clearance(self, **kwargs):
+        """
+        check every pair of neighbouring wells for their minimum separation, spreading the pairwise segment
+        distance calculations across a process pool, and optionally write a consolidated report
+
+        A simple separation factor is reported if a positional uncertainty is given: the uncertainty radius of
+        each well grows linearly with MD and the factor relates the centre-to-centre distance to the sum of both
+        radii at the closest approach, the radii are converted from depth units into the surface units of the
+        distance.
+
+        :param kwargs: unpacked keyword dictionary
+        :return: list of tuples (well A, well B, MD A, MD B, distance, separation factor or None) sorted by distance
+        """
+        kwargs.setdefault('radius', 1000.0)
+        kwargs.setdefault('workers', None)                  # None: number of CPUs, 0/1: serial execution
+        kwargs.setdefault('uncertainty', 0.0)               # uncertainty radius per length unit of MD
+        kwargs.setdefault('datadir', 'data')
+        kwargs.setdefault('filename_out', None)             # no report default
+        radius = kwargs['radius']
+        tasks = [(wella, wellb, radius, self.get_shared_depth(wella, wellb))
+                 for wella, wellb in self.get_neighbour_pairs(radius)]
+        print('Number of well pairs to scan: ', len(tasks))
+        workers = kwargs['workers']
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers > 1 and len(tasks) > 1:
+            chunksize = max(len(tasks) // (workers * 4), 1)
+            with multiprocessing.Pool(workers, _init_scan_worker, (self.trajectories, self.cellsize)) as pool:
+                results = pool.map(_scan_pair, tasks, chunksize)
+        else:
+            _init_scan_worker(self.trajectories, self.cellsize)
+            results = [_scan_pair(task) for task in tasks]
+            _init_scan_worker(dict(), self.cellsize)
+        report = []
+        for item in results:
+            if item is None:
+                continue
+            radii = kwargs['uncertainty'] * (item[2] * self.scalers[item[0]] + item[3] * self.scalers[item[1]])
+            factor = item[4] / radii if radii > 0.0 else None
+            report.append(item + (factor,))
+        report.sort(key=lambda x: x[4])
+        if self.verbose:
+            for item in report:
+                print('Wells: {0:s} / {1:s}, MD: {2:10.2f} / {3:10.2f}, Distance: {4:10.2f}'.format(*item))
+        if kwargs['filename_out']:
+            outheader = ('WELL A', 'WELL B', 'MD A', 'MD B', 'DISTANCE', 'SEPARATION FACTOR')
+            outdata = ([item[0], item[1], f'{item[2]:{10}.{2}f}', f'{item[3]:{10}.{2}f}', f'{item[4]:{10}.{2}f}',
+                        '' if item[5] is None else f'{item[5]:{10}.{3}f}'] for item in report)
+            outargs = {'datadir': kwargs['datadir'], 'filename_out': kwargs['filename_out'],
+                       'header_out': outheader, 'data_out': outdata, 'verbose': self.verbose}
+            writer = fileio.BHReaderWriter(**outargs)
+            writer.write_data()
+        return report
+
+
+# trajectories shared with the worker processes of a clearance scan
+_SCAN_STATE = {'trajectories': dict(), 'cellsize': 100.0}
+
+
+def _init_scan_worker(trajectories, cellsize):
+    """
+    process pool initializer handing the sampled trajectories over to a worker once
+
+    :param trajectories: dictionary of sampled trajectories keyed by well name
+    :param cellsize: grid cell size of the local index
+    """
+    _SCAN_STATE['trajectories'] = trajectories
+    _SCAN_STATE['cellsize'] = cellsize
+
+
+def _scan_pair(task):
+    """
+    process pool task calculating the closest approach of a pair of wells
+
+    :param task: tuple of well A, well B, search radius and MD of the hole shared by both wells (None: no
+                 shared hole)
+    :return: tuple (well A, well B, MD A, MD B, distance) or None if the wells are farther apart than the radius
+    """
+    wella, wellb, radius, shared = task
+    local = TrajectoryIndex(cellsize=_SCAN_STATE['cellsize'])
+    local.add_trajectory(wellb, clip_trajectory(_SCAN_STATE['trajectories'][wellb], shared))
+    result = local.closest_approach(clip_trajectory(_SCAN_STATE['trajectories'][wella], shared), radius)
+    if not result:
+        return None
+    return (wella, wellb) + result[0][1:]
+
+
+if __name__ == '__main__':                  # call test environment only if module is called standalone
+    TWIDTH = 79                               # terminal width excluding EOL
+    print(TWIDTH*'=')
+    print('module test: collisionmath'.ljust(TWIDTH, '-'))
+    print(TWIDTH*'=')
+    from modules import welldatabase
+    print('Testing: Class TrajectoryIndex')
+    welldb = welldatabase.WellDatabase(datadir='..\\data')
+    index = TrajectoryIndex(welldatabase=welldb, verbose=True)
+    for name in sorted(welldb.wells):
+        print('Reference well: ' + name)
+        index.closest_approach(name, radius=500.0)
+    print(TWIDTH*'=')
+    print('Testing: clearance scan')
+    index.scan_clearance(radius=500.0, uncertainty=0.01, datadir='..\\data', filename_out='out_clearance.txt')
+    print(TWIDTH*'=')
+else:
+    print('Importing ' + __name__)
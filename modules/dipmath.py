@@ -16,6 +16,18 @@
 from modules import fileio
 
 
+def get_output_formats(mode=0):
+    """
+    per column format specifications for the output_values of :class:`DipMarker`
+
+    :param mode: basic(0) or detailed(1) output
+    :return: tuple of format specifications (str), '10.2f' for MD and '10.5f' for all angles
+    """
+    if mode == 0:
+        return ('10.2f',) + 2 * ('10.5f',)
+    return ('10.2f',) + 6 * ('10.5f',)
+
+
 class DipPoint(object):
     """provides dip and dip azimuth properties to a point including a corresponding
     tangential vector and its manipulation
@@ -191,20 +203,20 @@ def __str__(self):
         return 'MD: {0:8.3f}, Dip: {1:8.3f}, Azimuth: {2:8.3f}'.format(self.md, math.degrees(self.dip),
                                                                        math.degrees(self.dazim))
 
-    def output_list(self, mymode=0):
+    def output_values(self, mymode=0):
         """
+        unformatted columns for bulk export to CSV file, see :func:`get_output_formats`
 
-        :param mymode:
-        :return:
+        :param mymode: basic(0) or detailed(1) output
+        :return: tuple of floats (MD[length], DIP[deg], DAZI[deg]) or for detailed output
+                 (MD[length], DIP_ORIG[deg], DAZI_ORIG[deg], DIP[deg], DAZI[deg], INCL[deg], AZIM[deg])
         """
         if mymode == 0:
-            return [f'{self.md:{10}.{2}f}', f'{math.degrees(self.dip):{10}.{5}f}',
-                    f'{math.degrees(self.dazim):{10}.{5}f}']
+            return self.md, math.degrees(self.dip), math.degrees(self.dazim)
         else:
-            return [f'{self.md:{10}.{2}f}', f'{math.degrees(self.in_dip):{10}.{5}f}',
-                    f'{math.degrees(self.in_dazim):{10}.{5}f}',
-                    f'{math.degrees(self.dip):{10}.{5}f}', f'{math.degrees(self.dazim):{10}.{5}f}',
-                    f'{math.degrees(self.clpoint.incl):{10}.{5}f}', f'{math.degrees(self.clpoint.azim):{10}.{5}f}']
+            return (self.md, math.degrees(self.in_dip), math.degrees(self.in_dazim),
+                    math.degrees(self.dip), math.degrees(self.dazim),
+                    math.degrees(self.clpoint.incl), math.degrees(self.clpoint.azim))
 
     def reorient_dip(self):
         """
@@ -263,9 +275,6 @@ def reorient_dip(self):
     print('Writing dipmarker file:')
     # mode = basic(0) or detailed(1) output
     mode = 1
-    outdata = []
-    for item in result:
-        outdata.append(item.output_list(mode))
     if mode == 1:
         outheader = ('Well: UNKNOWN', 'MD [depthunit]', 'DIP_ORIG [deg]',
                      'DAZI_ORIG [deg]', 'DIP [deg]', 'DAZI [deg]', 'INCL [deg]', 'AZIM [deg]')
@@ -273,9 +282,9 @@ def reorient_dip(self):
         outheader = ('Well: UNKNOWN', 'MD [depthunit]', 'DIP [deg]', 'DAZI [deg]')
  
     outargs = {'datadir': '..\\data', 'filename_out': 'out_sample-dipmarker.txt',
-               'header_out': outheader, 'data_out': outdata, 'verbose': True}
+               'header_out': outheader, 'formats_out': get_output_formats(mode), 'verbose': True}
     writer = fileio.BHReaderWriter(**outargs)
-    writer.write_data()
+    writer.write_rows(item.output_values(mode) for item in result)
     print(TWIDTH*'=')
 else:
     print('Importing ' + __name__)
@@ -9,8 +9,129 @@
 # tools for reading/writing CSV (comma-separated values) files
 
 
+import bz2
 import csv
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import mmap
+import os
+import pickle
+import struct
 import sys
+import tempfile
+from array import array
+from itertools import islice, starmap
+
+
+COMPRESSION = {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+"""supported compression formats and their opening functions, keyed by file extension"""
+MAGICBYTES = ((b'\x1f\x8b', 'gz'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'))
+"""leading bytes identifying compressed files independently from their extension"""
+DECOMPRESSION = {'gz': lambda file: gzip.GzipFile(fileobj=file, mode='rb'), 'bz2': bz2.BZ2File, 'xz': lzma.LZMAFile}
+"""decompressing readers wrapping an already opened binary file, keyed by file extension"""
+BINARYMAGIC = b'BHTCOL01'
+"""leading bytes of the columnar binary table format, see :meth:`BHReaderWriter.write_binary`"""
+
+
+def get_compression(filename, detect=True):
+    """
+    compression format of a file identified by its extension or for existing files by its leading bytes
+
+    :param filename: file name including path
+    :param detect: inspect the leading bytes of the file if the extension is not conclusive
+    :return: key of COMPRESSION or None for uncompressed files
+    """
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension in COMPRESSION:
+        return extension
+    if detect:
+        with open(filename, 'rb') as file:
+            return get_magic_compression(file.read(6))
+    return None
+
+
+def get_magic_compression(lead):
+    """
+    :param lead: leading bytes of a file
+    :return: key of COMPRESSION or None for uncompressed files
+    """
+    for magic, compression in MAGICBYTES:
+        if lead.startswith(magic):
+            return compression
+    return None
+
+
+class DecompressedText(io.TextIOWrapper):
+    """
+    text layer on a decompressing reader which closes the underlying binary file together with the reader
+    """
+    def __init__(self, reader, file, newline=None):
+        """
+        :param reader: decompressing reader, see DECOMPRESSION
+        :param file: binary file object wrapped by the reader
+        :param newline: newline handling, see :func:`open`
+        """
+        super(DecompressedText, self).__init__(reader, newline=newline)
+        self.file = file
+
+    def close(self):
+        """close text layer, reader and file"""
+        try:
+            super(DecompressedText, self).close()
+        finally:
+            self.file.close()
+
+
+def open_file(filename, mode='r', newline=None, compression=None):
+    """
+    open a text file, compressed files are transparently (de-)compressed while being streamed
+
+    :param filename: file name including path
+    :param mode: 'r' for reading (compression detected automatically) or 'w' for writing
+    :param newline: newline handling handed to the text layer, see :func:`open`
+    :param compression: key of COMPRESSION to force a compression format, Default ``None``: detect
+    :return: file object in text mode
+    """
+    if compression is None:
+        compression = get_compression(filename, detect=False)
+    if compression is not None:
+        return COMPRESSION[compression](filename, mode + 't', newline=newline)
+    if 'r' not in mode:
+        return open(filename, mode, newline=newline, buffering=1 << 20)
+    # the file is opened once, its leading bytes are inspected in the buffer before choosing the text layer
+    file = open(filename, 'rb', buffering=1 << 20)
+    try:
+        compression = get_magic_compression(file.peek(6)[:6])
+        if compression is None:
+            return io.TextIOWrapper(file, newline=newline)
+        return DecompressedText(DECOMPRESSION[compression](file), file, newline=newline)
+    except BaseException:
+        file.close()
+        raise
+
+
+def get_file_signature(filename, check='mtime'):
+    """
+    signature of a file to detect modifications
+
+    :param filename: file name including path
+    :param check: 'mtime': size and modification time, 'hash': size and SHA-1 digest of the content
+    :return: tuple of size and modification time or digest, None for missing files
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    if check == 'hash':
+        digest = hashlib.sha1()
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return stat.st_size, digest.hexdigest()
+    return stat.st_size, stat.st_mtime
 
 
 class BHReaderWriter(object):
@@ -33,6 +154,9 @@ def __init__(self, **kwargs):
         kwargs.setdefault('header_out', ('DEFAULT',))
         kwargs.setdefault('data_out', [])
         kwargs.setdefault('verbose', False)
+        kwargs.setdefault('cachedir', None)
+        kwargs.setdefault('formats_out', None)
+        kwargs.setdefault('compression_out', None)
         self.path = kwargs['datadir']
         self.filein = kwargs['filename_in']
         self.headerlines = kwargs['headerlines_in']
@@ -40,7 +164,77 @@ def __init__(self, **kwargs):
         self.fileout = kwargs['filename_out']
         self.headerout = kwargs['header_out']
         self.dataout = kwargs['data_out']
+        # per column format specifications of numeric output, e.g. ('14.2f', '14.2f', '10.2f')
+        self.formatsout = kwargs['formats_out']
+        # compression of output files ('gz', 'bz2', 'xz'), appended to filename_out as extension, None: plain text
+        self.compressionout = kwargs['compression_out']
+        if self.compressionout is not None and self.compressionout not in COMPRESSION:
+            raise ValueError('Exception: Unknown output compression - use one of ' + ', '.join(COMPRESSION))
         self.verbose = kwargs['verbose']
+        # directory of binary parse cache files, None: no caching
+        self.cachedir = kwargs['cachedir']
+
+    def _get_cache_key(self, kind):
+        """
+        key identifying parsed data of the input file, changes with file size, modification time and
+        reading parameters
+
+        :param kind: tuple describing the kind of parsed data
+        :return: tuple of cache file name and key
+        """
+        filename = self.path + '\\' + self.filein
+        stat = os.stat(filename)
+        key = (os.path.abspath(filename), stat.st_size, stat.st_mtime, tuple(self.columns), self.headerlines, kind)
+        cachefile = self.cachedir + '\\' + hashlib.sha1(repr(key[:1] + key[3:]).encode()).hexdigest() + '.bhc'
+        return cachefile, key
+
+    def _load_cache(self, kind):
+        """
+        load parsed data from the binary cache if its key matches
+
+        :param kind: tuple describing the kind of parsed data
+        :return: cached data or None
+        """
+        if self.cachedir is None:
+            return None
+        cachefile, key = self._get_cache_key(kind)
+        try:
+            with open(cachefile, 'rb') as file:
+                stored = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError,
+                IndexError):
+            # truncated or foreign cache files are treated as a cache miss
+            return None
+        if not isinstance(stored, dict) or 'data' not in stored or stored.get('key') != key:
+            return None
+        if self.verbose:
+            print('Parsed data loaded from cache: ' + cachefile)
+        return stored['data']
+
+    def _save_cache(self, kind, data):
+        """
+        store parsed data in the binary cache, failures (e.g. read-only directories) are not fatal
+
+        :param kind: tuple describing the kind of parsed data
+        :param data: parsed data
+        """
+        if self.cachedir is None:
+            return
+        cachefile, key = self._get_cache_key(kind)
+        tempname = None
+        try:
+            os.makedirs(self.cachedir, exist_ok=True)
+            # written to a unique temporary file and replaced atomically, concurrent readers and writers never
+            # see a truncated cache file
+            with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(cachefile) or '.',
+                                             prefix=os.path.basename(cachefile), suffix='.tmp', delete=False) as file:
+                tempname = file.name
+                pickle.dump({'key': key, 'data': data}, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tempname, cachefile)
+        except OSError:
+            print('Warning: Parsed data could not be cached in: ' + cachefile)
+            if tempname is not None and os.path.exists(tempname):
+                os.remove(tempname)
     
     def read_head(self):
         """
@@ -50,64 +244,442 @@ def read_head(self):
         :return: list of str containing the header lines (def: list of one line)
         """
         filename = self.path + '\\' + self.filein
-        with open(filename, 'r') as file:
+        with open_file(filename) as file:
             output = []
-            num_lines = sum(1 for _ in file)
-            print('Number of lines in file:', num_lines)
-            outlines = self.headerlines
-            if self.headerlines > num_lines:
-                outlines = self.headerlines
-            file.seek(0)
-            for _ in range(outlines):
+            for _ in range(self.headerlines):
                 output.append(file.readline())
         return output
+
+    def read_columns(self, numeric=None):
+        """
+        open an CSV file once for reading its header lines and its data columns in the order as specified by
+        self.columns tuple, numeric columns are converted while reading
+
+        :param numeric: positions within self.columns holding numbers, Default: all columns
+        :return: tuple of header lines (list of str) and columns (array of float for numeric columns or
+                 list of str otherwise)
+        """
+        if numeric is None:
+            numeric = range(len(self.columns))
+        kind = ('columns', tuple(numeric))
+        cached = self._load_cache(kind)
+        if cached is not None:
+            return cached
+        columns = [array('d') if position in numeric else [] for position in range(len(self.columns))]
+        appenders = [(self.columns[position], columns[position].append, position in numeric)
+                     for position in range(len(self.columns))]
+        filename = self.path + '\\' + self.filein
+        with open_file(filename) as csvfile:
+            header = []
+            for _ in range(self.headerlines):
+                header.append(csvfile.readline())
+            csvreader = csv.reader(csvfile, delimiter=',', quotechar='|', skipinitialspace=True)
+            rows = 0
+            for row in csvreader:
+                if len(row) == 0:
+                    continue
+                rows += 1
+                for col, append, isnumber in appenders:
+                    try:
+                        append(float(row[col]) if isnumber else row[col])
+                    except ValueError:
+                        raise ValueError('Exception: Non-numeric value in data row {0:d}'.format(rows), row)
+        print('Number of rows read: ', rows)
+        self._save_cache(kind, (header, columns))
+        return header, columns
+
+    def read_grouped_columns(self, sort=False):
+        """
+        open an CSV file once and split its numeric data columns into groups keyed by the first column of the
+        self.columns tuple, e.g. a combined survey table of a whole field with WELL, MD, INCL, AZIM columns
+
+        :param sort: sort the rows of each group by its first numeric column (e.g. MD)
+        :return: tuple of header lines (list of str) and dictionary of columns (list of array of float) keyed by
+                 the first column, groups are in order of their first occurrence
+        """
+        kind = ('grouped', bool(sort))
+        cached = self._load_cache(kind)
+        if cached is not None:
+            return cached
+        keycolumn = self.columns[0]
+        valuecolumns = self.columns[1:]
+        groups = dict()
+        filename = self.path + '\\' + self.filein
+        with open_file(filename) as csvfile:
+            header = []
+            for _ in range(self.headerlines):
+                header.append(csvfile.readline())
+            csvreader = csv.reader(csvfile, delimiter=',', quotechar='|', skipinitialspace=True)
+            rows = 0
+            for row in csvreader:
+                if len(row) == 0:
+                    continue
+                rows += 1
+                key = row[keycolumn]
+                try:
+                    values = [float(row[col]) for col in valuecolumns]
+                except ValueError:
+                    raise ValueError('Exception: Non-numeric value in data row {0:d}'.format(rows), row)
+                if key not in groups:
+                    groups[key] = [array('d') for _ in valuecolumns]
+                for column, value in zip(groups[key], values):
+                    column.append(value)
+        if sort:
+            for key, columns in groups.items():
+                order = sorted(range(len(columns[0])), key=columns[0].__getitem__)
+                groups[key] = [array('d', [column[row] for row in order]) for column in columns]
+        print('Number of rows read: ', rows, ', number of groups: ', len(groups))
+        self._save_cache(kind, (header, groups))
+        return header, groups
         
-    def read_data(self):
+    def iter_data(self):
         """
-        open an CSV file for reading and return data columns in the order as specified by self.columns tuple
-        and row by row
+        open an CSV file for reading and yield data columns in the order as specified by self.columns tuple
+        row by row while the file is being read
 
-        :return: list of list of str
+        :return: generator of list of str
         """
         filename = self.path + '\\' + self.filein
-        with open(filename, 'r') as csvfile:
+        with open_file(filename) as csvfile:
             csvreader = csv.reader(csvfile, delimiter=',', quotechar='|', skipinitialspace=True)
             # skip header
             for _ in range(self.headerlines):
                 next(csvreader)
             try:
-                output = []
                 for row in csvreader:
                     if len(row) == 0:
                         continue
                     # copy lines into array
-                    outline = []
-                    # print(row)
-                    for col in self.columns:
-                        # print(col)
-                        outline.append(row[col])
-                    output.append(outline)
+                    yield [row[col] for col in self.columns]
             except ValueError:
                 print('Exception: File reading error occurred')
                 sys.exit()
-        print('Number of rows read: ', len(output))
+
+    def read_data(self):
+        """
+        open an CSV file for reading and return data columns in the order as specified by self.columns tuple
+        and row by row
+
+        :return: list of list of str
+        """
+        output = self._load_cache(('rows',))
+        if output is None:
+            output = list(self.iter_data())
+            print('Number of rows read: ', len(output))
+            self._save_cache(('rows',), output)
         if self.verbose:
             for row in output:
                 print(row)
         return output
 
-    def write_data(self):
+    def get_filename_out(self):
         """
-        open an CSV file for writing and compose it based on headerlines and a data field
+        :return: output file name including path and the extension of the output compression
         """
         filename = self.path + '\\' + self.fileout
-        with open(filename, 'w', newline='') as csvfile:
+        if self.compressionout is not None and get_compression(filename, detect=False) != self.compressionout:
+            filename += '.' + self.compressionout
+        return filename
+
+    def write_data(self):
+        """
+        open an CSV file for writing and compose it based on headerlines and a data field, the data field may be
+        any iterable including a generator producing rows while they are written
+        """
+        rows = 0
+        with open_file(self.get_filename_out(), 'w', newline='', compression=self.compressionout) as csvfile:
             csvwriter = csv.writer(csvfile, delimiter=',')
             csvwriter.writerow(self.headerout)
             for item in self.dataout:
                 csvwriter.writerow(item)
-        print('Number of points written: ', len(self.dataout))
-        
+                rows += 1
+        print('Number of points written: ', rows)
+
+    def write_rows(self, rows, formats=None, chunksize=8192):
+        """
+        bulk output of numeric rows: a row template compiled once from the column format specifications formats
+        chunks of rows into single strings which are written through a large buffer, the resulting file is
+        identical to :meth:`write_data` with rows formatted by the same specifications
+
+        :param rows: iterable of numeric rows (tuples), may be a generator
+        :param formats: per column format specifications, Default ``None``: use formats_out of the constructor
+        :param chunksize: number of rows formatted per write
+        """
+        if formats is None:
+            formats = self.formatsout
+        if not formats:
+            raise ValueError('Exception: No column formats specified for bulk output')
+        template = ','.join('{:' + spec + '}' for spec in formats) + '\r\n'
+        formatter = template.format
+        rows = iter(rows)
+        count = 0
+        with open_file(self.get_filename_out(), 'w', newline='', compression=self.compressionout) as csvfile:
+            csvwriter = csv.writer(csvfile, delimiter=',')
+            csvwriter.writerow(self.headerout)
+            while True:
+                chunk = list(islice(rows, chunksize))
+                if not chunk:
+                    break
+                csvfile.write(''.join(starmap(formatter, chunk)))
+                count += len(chunk)
+        print('Number of points written: ', count)
+
+    def write_columns(self, columns, formats=None, chunksize=8192):
+        """
+        bulk output of numeric columns, see :meth:`write_rows`
+
+        :param columns: sequence of equally long numeric columns (e.g. array('d'))
+        :param formats: per column format specifications, Default ``None``: use formats_out of the constructor
+        :param chunksize: number of rows formatted per write
+        """
+        self.write_rows(zip(*columns), formats, chunksize)
+
+    def write_binary(self, columns, labels, metadata=None):
+        """
+        output of typed columns as a columnar binary table which can be memory-mapped by consumers without parsing,
+        the file layout is
+
+            - 8 bytes: magic 'BHTCOL01'
+            - 4 bytes: little-endian unsigned int, length of the schema in bytes
+            - schema: UTF-8 encoded JSON object padded with blanks to let the data start at a multiple of 8 bytes,
+              keys: 'rows' (number of rows), 'metadata' (e.g. well name and units) and 'columns', a list of
+              {'name', 'unit', 'dtype', 'offset'} with dtype '<f8' (little-endian double) or '<i4' (little-endian
+              int indexing the list 'categories' of the column) and offset in bytes relative to the data start
+            - data: columns one after another, each padded to a multiple of 8 bytes
+
+        :param columns: sequence of equally long columns of numbers or str
+        :param labels: column labels in the format 'NAME [unit]' or 'NAME'
+        :param metadata: dictionary stored with the schema, e.g. well name and length units
+        """
+        if self.compressionout is not None:
+            print('Warning: Binary tables are written uncompressed to remain memory-mappable')
+        rows = len(columns[0]) if columns else 0
+        schema = {'rows': rows, 'metadata': metadata or {}, 'columns': []}
+        blocks = []
+        offset = 0
+        for column, label in zip(columns, labels):
+            if len(column) != rows:
+                raise ValueError('Exception: Columns of binary table differ in length')
+            name, _, unit = label.partition('[')
+            entry = {'name': name.strip(), 'unit': unit.rstrip(']').strip() or None}
+            try:
+                data = column if isinstance(column, array) and column.typecode == 'd' else array('d', column)
+                entry['dtype'] = '<f8'
+            except TypeError:
+                # non-numeric columns (e.g. well names) are stored as indices into a list of categories
+                categories = dict()
+                data = array('i', [categories.setdefault(item, len(categories)) for item in column])
+                entry['dtype'] = '<i4'
+                entry['categories'] = list(categories)
+            if sys.byteorder != 'little':
+                data = array(data.typecode, data)
+                data.byteswap()
+            block = data.tobytes()
+            block += bytes(-len(block) % 8)
+            entry['offset'] = offset
+            offset += len(block)
+            schema['columns'].append(entry)
+            blocks.append(block)
+        encoded = json.dumps(schema).encode('utf-8')
+        encoded += b' ' * (-(len(BINARYMAGIC) + 4 + len(encoded)) % 8)
+        filename = self.path + '\\' + self.fileout
+        with open(filename, 'wb') as binfile:
+            binfile.write(BINARYMAGIC + struct.pack('<I', len(encoded)) + encoded)
+            for block in blocks:
+                binfile.write(block)
+        print('Number of points written: ', rows)
+
+    def read_binary(self):
+        """
+        read a columnar binary table written by :meth:`write_binary` from the input file
+
+        :return: tuple of schema (dict) and columns (array of float or list of str for categorical columns)
+        """
+        filename = self.path + '\\' + self.filein
+        with open(filename, 'rb') as binfile, mmap.mmap(binfile.fileno(), 0, access=mmap.ACCESS_READ) as binmap:
+            if binmap[:len(BINARYMAGIC)] != BINARYMAGIC:
+                raise ValueError('Exception: File is not a columnar binary table: ' + filename)
+            start = len(BINARYMAGIC) + 4
+            length, = struct.unpack('<I', binmap[len(BINARYMAGIC):start])
+            schema = json.loads(binmap[start:start + length].decode('utf-8'))
+            start += length
+            columns = []
+            for entry in schema['columns']:
+                data = array('d' if entry['dtype'] == '<f8' else 'i')
+                offset = start + entry['offset']
+                data.frombytes(binmap[offset:offset + schema['rows'] * data.itemsize])
+                if sys.byteorder != 'little':
+                    data.byteswap()
+                if 'categories' in entry:
+                    data = [entry['categories'][index] for index in data]
+                columns.append(data)
+        return schema, columns
+
+
+class BHIndexedReader(BHReaderWriter):
+    """
+    A memory-mapped reader for very large CSV files providing random access to row ranges and to all rows
+    sharing a key (e.g. a well name) through a row offset index, which is persisted next to the file
+    """
+
+    INDEXVERSION = 1
+    """version of the persisted index layout"""
+
+    def __init__(self, **kwargs):
+        """
+        constructor maps the input file into memory and loads or builds its row offset index
+
+        :param kwargs: keywords of :class:`BHReaderWriter` and additionally
+
+            - *key_column* (``int``) -- column index used to group rows by key, Default ``None``: no key index
+            - *persist_index* (``bool``) -- store the index as '<filename>.idx' next to the file, Default ``True``
+        """
+        kwargs.setdefault('key_column', None)
+        kwargs.setdefault('persist_index', True)
+        super(BHIndexedReader, self).__init__(**kwargs)
+        self.keycolumn = kwargs['key_column']
+        self.filename = self.path + '\\' + self.filein
+        self.indexfile = self.filename + '.idx'
+        if get_compression(self.filename, detect=False) is not None:
+            raise ValueError('Exception: Compressed files cannot be memory-mapped - use BHReaderWriter instead')
+        self.file = open(self.filename, 'rb')
+        try:
+            if os.fstat(self.file.fileno()).st_size == 0:
+                # empty files cannot be mapped, an empty bytes object yields the same (empty) index
+                self.map = b''
+            else:
+                # mapping is shared with the page cache, i.e. with other processes reading the same file
+                self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.file.close()
+            raise
+        if get_magic_compression(self.map[:6]) is not None:
+            self.close()
+            raise ValueError('Exception: Compressed files cannot be memory-mapped - use BHReaderWriter instead')
+        # start offsets of data rows plus end of file
+        self.offsets = array('q')
+        # rows per key as arrays of row numbers
+        self.keys = dict()
+        stat = os.stat(self.filename)
+        self.signature = (BHIndexedReader.INDEXVERSION, stat.st_size, stat.st_mtime, self.headerlines,
+                          self.keycolumn)
+        if not self._load_index():
+            self._build_index()
+            if kwargs['persist_index']:
+                self._save_index()
+        if self.verbose:
+            print('Number of indexed rows: ', len(self))
+
+    def __len__(self):
+        """number of data rows"""
+        return max(len(self.offsets) - 1, 0)
+
+    def __enter__(self):
+        """context manager support"""
+        return self
+
+    def __exit__(self, *args):
+        """context manager support"""
+        self.close()
+
+    def close(self):
+        """
+        release memory map and file handle
+        """
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def _load_index(self):
+        """
+        load a persisted index if it matches file size, modification time and index settings
+
+        :return: True on success
+        """
+        try:
+            with open(self.indexfile, 'rb') as file:
+                stored = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if stored.get('signature') != self.signature:
+            return False
+        self.offsets = stored['offsets']
+        self.keys = stored['keys']
+        if self.verbose:
+            print('Row index loaded from: ' + self.indexfile)
+        return True
+
+    def _save_index(self):
+        """
+        persist the index next to the input file, failures (e.g. read-only directories) are not fatal
+        """
+        try:
+            with open(self.indexfile, 'wb') as file:
+                pickle.dump({'signature': self.signature, 'offsets': self.offsets, 'keys': self.keys}, file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            print('Warning: Row index could not be saved to: ' + self.indexfile)
+
+    def _build_index(self):
+        """
+        scan the memory map once for line starts, skipping header and empty lines
+        """
+        data = self.map
+        position = 0
+        size = len(data)
+        for _ in range(self.headerlines):
+            end = data.find(b'\n', position)
+            position = size if end < 0 else end + 1
+        while position < size:
+            end = data.find(b'\n', position)
+            if end < 0:
+                end = size
+            if data[position:end].strip():
+                if self.keycolumn is not None:
+                    key = self._parse_line(position, end)[self.keycolumn]
+                    self.keys.setdefault(key, array('l')).append(len(self.offsets))
+                self.offsets.append(position)
+            position = end + 1
+        self.offsets.append(size)
+
+    def _parse_line(self, start, end):
+        """
+        :return: all fields of the line between two offsets as list of str
+        """
+        line = self.map[start:end].decode().rstrip('\r\n')
+        return next(csv.reader([line], delimiter=',', quotechar='|', skipinitialspace=True))
+
+    def _get_row(self, row):
+        """
+        :return: fields of a data row in the order as specified by self.columns tuple
+        """
+        start = self.offsets[row]
+        end = self.map.find(b'\n', start, self.offsets[row + 1])
+        fields = self._parse_line(start, self.offsets[row + 1] if end < 0 else end)
+        return [fields[col] for col in self.columns]
+
+    def read_rows(self, start=0, stop=None):
+        """
+        read a range of data rows without touching the rest of the file
+
+        :param start: first row number
+        :param stop: row number after the last row, Default: end of file
+        :return: list of list of str
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self._get_row(row) for row in range(max(start, 0), stop)]
+
+    def read_key(self, key):
+        """
+        read all data rows sharing a value in the key column, e.g. all rows of a well
+
+        :param key: value of the key column
+        :return: list of list of str in file order, empty if the key does not exist
+        """
+        if self.keycolumn is None:
+            raise ValueError('Exception: Reader has been set up without key column')
+        return [self._get_row(row) for row in self.keys.get(key, ())]
+
 
 if __name__ == '__main__':                  # call test environment only if module is called standalone
     TWIDTH = 79                             # terminal width excluding EOL
@@ -124,6 +696,19 @@ def write_data(self):
                         verbose=True)
     for line in rw.read_data():
         print(line)
+    print('Reading typed columns in a single pass:')
+    head, cols = rw.read_columns()
+    print(head, cols)
     rw.write_data()
+    print('Bulk writing of numeric columns:')
+    rw.write_columns((array('d', [1.0, 2.5]), array('d', [3.14159, 2.71828])), ('10.2f', '10.5f'))
+    print('Columnar binary table:')
+    rw = BHReaderWriter(filename_out='out_test_fileio.bht', filename_in='out_test_fileio.bht')
+    rw.write_binary((['A', 'B', 'A'], array('d', [1.0, 2.5, 4.0])), ('WELL', 'MD [ft]'), {'source': 'test'})
+    print(rw.read_binary())
+    print('Random access to rows:')
+    with BHIndexedReader(filename_in='sample-markers.txt', columns_in=(1, 2, 3), key_column=1) as ir:
+        print(len(ir), ir.read_rows(2, 4))
+        print(ir.read_key('NX-11212'))
 else:
     print('Importing ' + __name__)
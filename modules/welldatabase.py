@@ -10,21 +10,30 @@
 
 import sys
 import glob
+import hashlib
+import math
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 from modules import boreholemath
 from modules import fileio
 from modules import markermath
+from modules import welldbstore
 
 
 class Well(object):
     """
-    Well object holds shared horizontal and vertical length units and individual well properties:
+    Well object holds its horizontal and vertical length units, verbosity and individual well properties:
      WELL NAME, ORIGIN, GEOMETRY (DEVIATION SURVEY), WELL MARKERS
     """
 
     DEPTHUNIT = 'ft'
     SURFUNIT = 'ft'
-    """define static variables and helper functions to force consistent length handling across well data"""
+    """define static variables and helper functions for default length units of wells set up without explicit
+    units, wells of a :class:`WellDatabase` carry the units of their database"""
 
     @staticmethod
     def depth_to_metric():
@@ -63,17 +72,16 @@ def surf_to_imperial():
             print('Surface units switched to Imperial')
 
     VERBOSE = False
-    """define static variable for verbosity"""
+    """define static variable for default verbosity"""
 
     @staticmethod
-    def switch_verbose():
+    def set_verbose(verbose=True):
         """
-        static function to switch on/off verbose output to console
+        static function to set the default of verbose output to console
+
+        :param verbose: verbose output on (True) or off (False)
         """
-        if Well.VERBOSE:
-            Well.VERBOSE = False
-        else:
-            Well.VERBOSE = True
+        Well.VERBOSE = bool(verbose)
 
     def __init__(self, **kwargs):
         r"""
@@ -93,12 +101,36 @@ def __init__(self, **kwargs):
               deviation survey file
             * *wellname* (``string``) --
               unique well name
+            * *depthunit* (``string``) --
+              vertical length unit 'ft' or 'm', Default ``Well.DEPTHUNIT``
+            * *surfaceunit* (``string``) --
+              horizontal length unit 'ft' or 'm', Default ``Well.SURFUNIT``
+            * *verbose* (``bool``) --
+              verbose output to console, Default ``Well.VERBOSE``
             * *origin* ((``float``, ``float``, ``float``)) --
               Cartesian location of well head (KB), Default ``(0.0, 0.0, 0.0)``
             * *headerlines_in* (``int``) --
               number of header lines in deviation survey file
             * *columns_in* ((``int``, ``int``, ``int``)) --
               default values for relevant data columns in deviation file (MD, INCL, AZIM), Default ``(1, 2, 3)``
+            * *cachedir* (``string``) --
+              directory for binary parse cache of the deviation survey file, Default ``None``: no caching
+            * *compression_out* (``string``) --
+              compression of output files ('gz', 'bz2', 'xz'), Default ``None``: plain text
+            * *formats_out* ((``string``, ``string``, ``string``)) --
+              format specifications of the three output columns, e.g. ('12.3f', '12.3f', '10.3f'),
+              Default ``None``: defaults of the output mode
+            * *survey_data* ((``array``, ``array``, ``array``)) --
+              pre-read survey columns (MD, INCL, AZIM) replacing the deviation survey file, Default ``None``
+            * *output_format* (``string``) --
+              output file format 'csv' or 'binary' (columnar table), Default ``'csv'``
+            * *lazy* (``bool``) --
+              defer loading of GEOMETRY to its first access, Default ``True``, ignored for output modes other than 0
+            * *parent* (:class:`Well`) --
+              parent well of a sidetrack, the trajectory above the kick-off is shared with the GEOMETRY of the
+              parent, Default ``None``: no sidetrack
+            * *kickoff* (``float``) --
+              kick-off MD of a sidetrack on its parent well, Default ``None``
             * key/values handed to :class:`modules.boreholemath.TransformBoreHoleSurvey` during GEOMETRY loading
 
                 - *mode* (``int``) --
@@ -107,9 +139,13 @@ def __init__(self, **kwargs):
                   interpolation interval along MD, Default ``50.0``
 
         """
-        if Well.VERBOSE:
-            print(kwargs)
         # ###########defaults
+        # unit and verbosity state of the well, class variables only provide defaults
+        kwargs.setdefault('depthunit', Well.DEPTHUNIT)
+        kwargs.setdefault('surfaceunit', Well.SURFUNIT)
+        kwargs.setdefault('verbose', Well.VERBOSE)
+        if kwargs['verbose']:
+            print(kwargs)
         kwargs.setdefault('datadir', 'data')
         kwargs.setdefault('filename_in', 'sample-borehole.txt')     # deviation survey file
         kwargs.setdefault('wellname', 'UNKNOWN')
@@ -117,27 +153,99 @@ def __init__(self, **kwargs):
         # default values for deviation file shape
         kwargs.setdefault('headerlines_in', 1)
         kwargs.setdefault('columns_in', (1, 2, 3))
+        kwargs.setdefault('cachedir', None)
+        kwargs.setdefault('compression_out', None)
+        kwargs.setdefault('formats_out', None)
+        kwargs.setdefault('survey_data', None)
+        kwargs.setdefault('output_format', 'csv')
         # default values for survey handling
         kwargs.setdefault('mode', 0)                                # no output default
         kwargs.setdefault('interval', 50)
+        kwargs.setdefault('lazy', True)
+        kwargs.setdefault('parent', None)
+        kwargs.setdefault('kickoff', None)
         
         # ###########variables
         self.wellname = kwargs['wellname']
         # (N(X), E(Y), KB) with KB being a positive number above reference level
         self.wellorigin = kwargs['origin']
-        # Well.DEPTHUNIT, Well.SURFUNIT, Well.VERBOSE set by helper function
+        self.depthunit = kwargs['depthunit']
+        self.surfunit = kwargs['surfaceunit']
+        self.verbose = kwargs['verbose']
+        self.parent = kwargs['parent']
+        self.kickoff = kwargs['kickoff']
         
-        devinargs = {'depthunit': Well.DEPTHUNIT, 'surfaceunits': Well.SURFUNIT, 'verbose': Well.VERBOSE,
+        devinargs = {'depthunit': self.depthunit, 'surfaceunit': self.surfunit, 'verbose': self.verbose,
                      'datadir': kwargs['datadir'], 'filename_in': kwargs['filename_in'],
                      'wellname': self.wellname, 'origin': self.wellorigin, 'headerlines_in': kwargs['headerlines_in'],
                      'columns_in': kwargs['columns_in'], 'relativeCoords': False, 'mode': kwargs['mode'],
-                     'interval': kwargs['interval']}
-        self.geometry = boreholemath.TransformBoreHoleSurvey(**devinargs)
+                     'interval': kwargs['interval'], 'cachedir': kwargs['cachedir'],
+                     'compression_out': kwargs['compression_out'], 'formats_out': kwargs['formats_out'],
+                     'survey_data': kwargs['survey_data'],
+                     'output_format': kwargs['output_format']}
+        # GEOMETRY is loaded on first access
+        self.geometryargs = devinargs
+        self._geometry = None
+        # serializes the first access of threads sharing the well, the survey is loaded only once
+        self._geometrylock = Lock()
+        if not kwargs['lazy'] or kwargs['mode'] != 0:
+            self.load_geometry()
         self.markers = dict()
         # keys are formation codes - do we need to allow for multiple entries in one key?
         #                      -> not for geometry purpose (else use subscripted key TERT_A /TERT_B)
         # self.markers = [] #alternatively list
 
+    @property
+    def geometry(self):
+        """
+        :return: TransformBoreHoleSurvey of the well, the deviation survey is loaded on first access
+        """
+        if self._geometry is None:
+            with self._geometrylock:
+                # checked again as another thread may have loaded the GEOMETRY while waiting for the lock
+                if self._geometry is None:
+                    if self.parent is not None:
+                        # the GEOMETRY of the parent well is loaded first and referenced by the sidetrack
+                        self._geometry = boreholemath.TransformBoreHoleSurvey(parent=self.parent.geometry,
+                                                                              kickoff=self.kickoff,
+                                                                              **self.geometryargs)
+                    else:
+                        self._geometry = boreholemath.TransformBoreHoleSurvey(**self.geometryargs)
+        return self._geometry
+
+    def load_geometry(self):
+        """
+        eager warm-up of the GEOMETRY
+
+        :return: TransformBoreHoleSurvey of the well
+        """
+        return self.geometry
+
+    def is_loaded(self):
+        """
+        :return: True if the GEOMETRY has already been loaded
+        """
+        return self._geometry is not None
+
+    def __getstate__(self):
+        """
+        pickle support (snapshots, worker processes), locks cannot be pickled
+
+        :return: dictionary of instance attributes
+        """
+        state = self.__dict__.copy()
+        del state['_geometrylock']
+        return state
+
+    def __setstate__(self, state):
+        """
+        pickle support, restores the instance attributes with a new lock
+
+        :param state: dictionary of instance attributes
+        """
+        self.__dict__.update(state)
+        self._geometrylock = Lock()
+
     def __str__(self):
         """overloaded string operator"""
         return 'Well name: {0:s}, X: {1:10.1f}, Y: {2:10.1f}, KB: {3:6.1f}'.format(self.wellname, *self.wellorigin)
@@ -162,6 +270,10 @@ def __init__(self, **kwargs):
         kwargs.setdefault('columns_in', (1, 2, 3, 4, 5))
         kwargs.setdefault('filename_strat_def', None)
         kwargs.setdefault('filename_strat_order', None)
+        kwargs.setdefault('cachedir', None)
+        # marker report written after loading, None: no report
+        kwargs.setdefault('filename_out', None)
+        kwargs.setdefault('output_format', 'csv')
 
         # ###########variables
         self.welldb = kwargs['welldatabase']
@@ -171,6 +283,7 @@ def __init__(self, **kwargs):
             print('Warning: generating default WellDatabase')
             print(self.welldb)
         self.verbose = kwargs['verbose']
+        self.cachedir = kwargs['cachedir']
 
         # ###########update stratigraphy before loading marker file
         if kwargs['filename_strat_def']:
@@ -181,6 +294,8 @@ def __init__(self, **kwargs):
             markermath.Stratigraphy.print_strat()
         # ###########load markers and match the ones mentioned in STRATORDER to the well database
         self.load_strat_markers(kwargs['filename_in'], kwargs['headerlines_in'], kwargs['columns_in'])
+        if kwargs['filename_out']:
+            self.write_strat_markers(kwargs['filename_out'], kwargs['output_format'])
 
     def load_strat_markers(self, markerfile, headerlines=1, columns=(1, 2, 3, 4, 5)):
         """
@@ -191,7 +306,7 @@ def load_strat_markers(self, markerfile, headerlines=1, columns=(1, 2, 3, 4, 5))
         """
         print('Opening marker file:')
         mfargs = {'datadir': self.datadir, 'filename_in': markerfile,
-                  'headerlines_in': headerlines, 'columns_in': columns}
+                  'headerlines_in': headerlines, 'columns_in': columns, 'cachedir': self.cachedir}
         if (len(columns)) not in (3, 5):
             print('Error: Column specification in marker file requires three or five rows to be supplied\n\tformat:\
                     WELL NAME, MARKER CODE, DEPTH MD [length], DIP(opt) [deg], DAZIM(opt) [deg]')
@@ -201,6 +316,10 @@ def load_strat_markers(self, markerfile, headerlines=1, columns=(1, 2, 3, 4, 5))
             validmarkers = dict()
             for item in markermath.Stratigraphy.STRATORDER:
                 validmarkers[item] = 1
+            # markers restored from a snapshot are replaced by the ones of the marker file
+            if self.welldb.snapshot:
+                for well in self.welldb.wells.values():
+                    well.markers = dict()
             # read marker table
             markerreader = fileio.BHReaderWriter(**mfargs)
             lines = markerreader.read_data()
@@ -239,9 +358,36 @@ def load_strat_markers(self, markerfile, headerlines=1, columns=(1, 2, 3, 4, 5))
             print('Exception: Value error during conversion of marker file')
             sys.exit(1)
         print('Well markers successfully loaded to well database')
+        self.welldb.save_snapshot()
+        if self.welldb.store is not None:
+            self.welldb.store.store_markers(self.welldb)
         if self.verbose:
             self.print_strat_markers()
 
+    def write_strat_markers(self, filename_out, output_format='csv'):
+        """
+        write a report of all stratigraphy markers of the well database sorted by well name and stratigraphic age
+
+        :param filename_out: name of the report file in the data directory
+        :param output_format: 'csv' text or 'binary' columnar table (see :meth:`fileio.BHReaderWriter.write_binary`)
+        """
+        labels = ('WELL', 'MARKER', 'MD [' + self.welldb.depthunit + ']', 'DIP [deg]', 'DAZIM [deg]')
+        columns = ([], [], [], [], [])
+        for wellname, well in self.welldb.get_wells_sorted().items():
+            for markertab in markermath.Stratigraphy.STRATORDER:
+                if markertab in well.markers:
+                    marker = well.markers[markertab]
+                    row = (wellname, markertab, marker.md, math.degrees(marker.dip), math.degrees(marker.dazim))
+                    for column, value in zip(columns, row):
+                        column.append(value)
+        writer = fileio.BHReaderWriter(datadir=self.datadir, filename_out=filename_out,
+                                       header_out=labels, verbose=self.verbose)
+        if output_format == 'binary':
+            metadata = {'depthunit': self.welldb.depthunit, 'surfaceunit': self.welldb.surfunit}
+            writer.write_binary(columns, labels, metadata)
+        else:
+            writer.write_columns(columns, ('s', 's', '10.2f', '10.5f', '10.5f'))
+
     def print_strat_markers(self):
         """
 
@@ -261,11 +407,32 @@ def print_strat_markers(self):
                 sys.exit()
 
 
+def _load_well(wellinargs):
+    """
+    build a well in a worker process, the GEOMETRY is loaded eagerly (see :meth:`WellDatabase.load_wells`),
+    output products already written to file are not pickled with the geometry which keeps the result returned to
+    the parent process compact
+
+    :param wellinargs: keyword dictionary of :class:`Well` including its unit and verbosity state
+    :return: Well instance
+    """
+    try:
+        return Well(**wellinargs)
+    except (SystemExit, Exception) as err:
+        # input checks exit on bad data, which would terminate the worker without returning a result to the pool
+        raise RuntimeError('Exception: Well {0:s} could not be built - {1!r}'.format(wellinargs['wellname'],
+                                                                                   err)) from None
+
+
 class WellDatabase(object):
     """
     WellDatabase object factory template creates well instances based on a user supplied well spreadsheet
     and corresponding supporting files
     """
+
+    SNAPSHOTVERSION = 2
+    """version of the persisted snapshot layout"""
+
     def __init__(self, **kwargs):
         """
         sets class parameters based on external keywords and / or robust defaults
@@ -285,22 +452,55 @@ def __init__(self, **kwargs):
         # default values for survey handling
         kwargs.setdefault('mode', 0)
         kwargs.setdefault('interval', 50)
+        # directory for binary parse cache of well head and survey files, None: no caching
+        kwargs.setdefault('cachedir', None)
+        # compression of survey output files, None: plain text
+        kwargs.setdefault('compression_out', None)
+        # format specifications of the three survey output columns, None: defaults of the output mode
+        kwargs.setdefault('formats_out', None)
+        # combined survey table of all wells (WELL, MD, INCL, AZIM) replacing the per-well deviation files
+        kwargs.setdefault('filename_survey', None)
+        kwargs.setdefault('headerlines_survey', 1)
+        kwargs.setdefault('columns_survey', (0, 1, 2, 3))
+        kwargs.setdefault('sort_survey', False)
+        # sidetrack table (WELL, PARENT WELL, KICK-OFF MD), None: all wells are loaded with their full survey
+        kwargs.setdefault('filename_sidetracks', None)
+        kwargs.setdefault('headerlines_sidetracks', 1)
+        kwargs.setdefault('columns_sidetracks', (0, 1, 2))
+        # number of threads reading deviation survey files concurrently, 1: sequential loading
+        kwargs.setdefault('threads', 1)
+        # number of worker processes building wells in parallel, 0/1: build in this process
+        kwargs.setdefault('processes', 0)
+        # survey output file format 'csv' or 'binary'
+        kwargs.setdefault('output_format', 'csv')
+        # defer loading of well geometries to their first access (only for mode 0 without thread or process pool)
+        kwargs.setdefault('lazy', True)
+        # snapshot file of the built database, unchanged wells are reused on reopening, None: no snapshot
+        kwargs.setdefault('snapshot', None)
+        # detection of changed survey files: 'mtime' (size and modification time) or 'hash' (content)
+        kwargs.setdefault('snapshot_check', 'mtime')
+        # SQLite file receiving well heads, stations, resampled points and markers, None: no SQLite store
+        kwargs.setdefault('store', None)
 
         # ###########variables
         self.wells = dict()
         self.verbose = kwargs['verbose']
+        # unit state of the database handed to its wells, shared class variables of Well are left untouched
+        self.depthunit = 'm' if kwargs['depthunit'] == 'm' else 'ft'
+        self.surfunit = 'm' if kwargs['surfaceunits'] == 'm' else 'ft'
         if self.verbose:
-            Well.switch_verbose()
             print('Opening well head file:')
         # create dictionary based on kwargs and load well head spreadsheet
         welldbinargs = {'datadir': kwargs['datadir'], 'filename_in': kwargs['filename_in'],
-                        'headerlines_in': kwargs['headerlines_in'], 'columns_in': kwargs['columns_in']}
+                        'headerlines_in': kwargs['headerlines_in'], 'columns_in': kwargs['columns_in'],
+                        'cachedir': kwargs['cachedir']}
         headreader = fileio.BHReaderWriter(**welldbinargs)
         lines = headreader.read_data()
-        if kwargs['depthunit'] == 'm':
-            Well.depth_to_metric()
-        if kwargs['surfaceunits'] == 'm':
-            Well.surf_to_metric()
+        surveys = self.read_survey_table(**kwargs)
+        sidetracks = self.read_sidetrack_table(**kwargs)
+        # collect well arguments in well head order, duplicates are resolved before loading
+        wellargs = []
+        wellnames = set()
         for line in lines:    
             try:
                 # convert spreadsheet data to proper type and check for depth-sorting
@@ -310,18 +510,279 @@ def __init__(self, **kwargs):
                 wfname = line[4]        # str: DEVIATION FILENAME
                 # create dictionary based on info in well head file
                 wellinargs = {'datadir': kwargs['datadir'], 'wellname': wname, 'origin': wcoordinates,
-                              'filename_in': wfname, 'mode': kwargs['mode'], 'interval': kwargs['interval']}
-                # do not allow duplicates and instantiate new well
-                if wname not in self.wells:
-                    self.wells[wname] = Well(**wellinargs)
-                else:
-                    print('Warning: Double occurrence of name in well head file, keeping first instance')
+                              'depthunit': self.depthunit, 'surfaceunit': self.surfunit, 'verbose': self.verbose,
+                              'filename_in': wfname, 'mode': kwargs['mode'], 'interval': kwargs['interval'],
+                              'cachedir': kwargs['cachedir'], 'compression_out': kwargs['compression_out'],
+                              'formats_out': kwargs['formats_out'],
+                              'output_format': kwargs['output_format'], 'lazy': kwargs['lazy']}
+                if surveys is not None:
+                    if wname in surveys:
+                        wellinargs['survey_data'] = surveys[wname]
+                    else:
+                        print('Warning: Well {0:s} not found in combined survey file, using {1:s}'.format(wname,
+                                                                                                         wfname))
+                if sidetracks is not None and wname in sidetracks:
+                    # parent well by name, resolved to its Well instance when building the sidetrack
+                    wellinargs['parent'], wellinargs['kickoff'] = sidetracks[wname]
             except ValueError:
                     print('Exception: Error during conversion of well head data')
                     sys.exit(1)
-            if self.verbose:
-                print('Input Name: {0:s}, X: {1:10.1f}, Y: {2:10.1f}, KB: {3:6.1f}'.format(wname, *wcoordinates))
-                print(str(self.wells[wname]))
+            # do not allow duplicates
+            if wname not in wellnames:
+                wellnames.add(wname)
+                wellargs.append(wellinargs)
+            else:
+                print('Warning: Double occurrence of name in well head file, keeping first instance')
+        # parent wells are built ahead of their sidetracks
+        buildargs = self.get_build_order(wellargs)
+        # reuse unchanged wells of the snapshot, instantiate all others and insert them in well head order
+        self.snapshot = kwargs['snapshot']
+        self.signatures = dict()
+        if self.snapshot:
+            for args in buildargs:
+                signature = self.get_well_signature(args, kwargs['snapshot_check'])
+                if 'parent' in args:
+                    # sidetracks are rebuilt together with their parent well
+                    signature += ((args['kickoff'], self.signatures[args['parent']]),)
+                self.signatures[args['wellname']] = signature
+        reused = self.load_snapshot()
+        pending = [args for args in buildargs if args['wellname'] not in reused]
+        try:
+            wells = dict(reused)
+            roots = [args for args in pending if 'parent' not in args]
+            wells.update(zip([args['wellname'] for args in roots],
+                             self.load_wells(roots, kwargs['threads'], kwargs['processes'])))
+            # sidetracks reference the Well instance of their parent and are built in this process
+            for args in pending:
+                if 'parent' in args:
+                    wells[args['wellname']] = Well(**dict(args, parent=wells[args['parent']]))
+            for wellinargs in wellargs:
+                well = wells[wellinargs['wellname']]
+                self.wells[wellinargs['wellname']] = well
+                if self.verbose:
+                    print('Input Name: {0:s}, X: {1:10.1f}, Y: {2:10.1f}, KB: {3:6.1f}'.format(
+                        wellinargs['wellname'], *wellinargs['origin']))
+                    print(str(well))
+        except ValueError:
+            print('Exception: Error during conversion of well head data')
+            sys.exit(1)
+        if self.snapshot:
+            print('Wells reused from snapshot: {0:d}, wells built: {1:d}'.format(len(reused), len(pending)))
+            # the snapshot holds the computed geometries, lazily set up wells are loaded before saving
+            self.warm_up()
+            self.save_snapshot()
+        self.store = None
+        if kwargs['store']:
+            self.store = welldbstore.WellDatabaseStore(filename=kwargs['store'], verbose=self.verbose)
+            self.store.store_database(self)
+
+    @staticmethod
+    def get_well_signature(wellinargs, check='mtime'):
+        """
+        signature of all inputs and settings a well is derived from, i.e. its well head row, its survey and the
+        shared length units
+
+        :param wellinargs: keyword dictionary of :class:`Well`
+        :param check: detection of changed survey files, 'mtime' or 'hash', see :func:`fileio.get_file_signature`
+        :return: tuple
+        """
+        if 'survey_data' in wellinargs:
+            # survey split from a combined table: signature by content
+            survey = hashlib.sha1(b''.join(column.tobytes() for column in wellinargs['survey_data'])).hexdigest()
+        else:
+            survey = fileio.get_file_signature(wellinargs['datadir'] + '\\' + wellinargs['filename_in'], check)
+        settings = (wellinargs['depthunit'], wellinargs['surfaceunit'], wellinargs['mode'], wellinargs['interval'],
+                    wellinargs['output_format'], wellinargs['compression_out'], wellinargs['formats_out'])
+        return wellinargs['origin'], wellinargs['filename_in'], survey, settings
+
+    def load_snapshot(self):
+        """
+        load the wells of the snapshot file whose signature is unchanged
+
+        :return: dictionary of reusable Well instances keyed by WELL NAME
+        """
+        reused = dict()
+        if not self.snapshot:
+            return reused
+        try:
+            with open(self.snapshot, 'rb') as file:
+                stored = pickle.load(file)
+        except FileNotFoundError:
+            return reused
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            print('Warning: Snapshot file could not be read, rebuilding well database: ' + self.snapshot)
+            return reused
+        if stored.get('version') != WellDatabase.SNAPSHOTVERSION:
+            return reused
+        for wellname, (signature, well) in stored['wells'].items():
+            if self.signatures.get(wellname) == signature:
+                reused[wellname] = well
+        return reused
+
+    def save_snapshot(self):
+        """
+        save all wells including loaded geometries and markers to the snapshot file, the file is replaced
+        atomically
+        """
+        if not self.snapshot:
+            return
+        stored = {'version': WellDatabase.SNAPSHOTVERSION,
+                  'wells': {wellname: (self.signatures[wellname], well) for wellname, well in self.wells.items()}}
+        try:
+            with open(self.snapshot + '.tmp', 'wb') as file:
+                pickle.dump(stored, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(self.snapshot + '.tmp', self.snapshot)
+        except OSError:
+            print('Warning: Snapshot file could not be written: ' + self.snapshot)
+
+    @staticmethod
+    def load_wells(wellargs, threads=1, processes=0):
+        """
+        instantiate wells and with it read their deviation survey files, a bounded pool of threads overlaps the
+        latency of opening and reading files (e.g. on network storage) with parsing, a pool of processes spreads
+        the CPU-bound survey calculation and output across cores, pooled wells load their GEOMETRY eagerly so that
+        the pools do the reading and calculation instead of handing back lazy wells
+
+        :param wellargs: list of keyword dictionaries of :class:`Well`
+        :param threads: maximum number of concurrently loading threads, 1: sequential loading
+        :param processes: number of worker processes, takes precedence over threads, 0/1: no worker processes
+        :return: iterable of Well instances in the order of wellargs
+        """
+        if processes > 1 and len(wellargs) > 1:
+            chunksize = max(1, len(wellargs) // (4 * processes))
+            with multiprocessing.Pool(processes) as pool:
+                try:
+                    return pool.map(_load_well, [dict(args, lazy=False) for args in wellargs], chunksize)
+                except RuntimeError as err:
+                    print(err.args[0])
+                    sys.exit(1)
+        if threads > 1 and len(wellargs) > 1:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                return list(pool.map(lambda args: Well(**dict(args, lazy=False)), wellargs))
+        return (Well(**args) for args in wellargs)
+
+    @staticmethod
+    def read_survey_table(**kwargs):
+        """
+        read a combined survey table of all wells in one pass and split it into per-well survey columns
+
+        :param kwargs: keywords of :class:`WellDatabase` with filename_survey, headerlines_survey,
+                       columns_survey (WELL, MD, INCL, AZIM) and sort_survey (sort stations by MD)
+        :return: dictionary of (MD, INCL, AZIM) columns keyed by WELL NAME or None without combined survey file
+        """
+        if kwargs['filename_survey'] is None:
+            return None
+        print('Opening combined survey file:')
+        surveyargs = {'datadir': kwargs['datadir'], 'filename_in': kwargs['filename_survey'],
+                      'headerlines_in': kwargs['headerlines_survey'], 'columns_in': kwargs['columns_survey'],
+                      'cachedir': kwargs['cachedir']}
+        if len(kwargs['columns_survey']) != 4:
+            print('Error: Column specification in combined survey file requires four rows to be supplied\n\t'
+                  'format: WELL NAME, MD [length], INCL [deg], AZIM [deg]')
+            sys.exit(1)
+        try:
+            _, surveys = fileio.BHReaderWriter(**surveyargs).read_grouped_columns(kwargs['sort_survey'])
+        except ValueError as err:
+            print('Exception: Error during conversion of combined survey file\n', err.args)
+            sys.exit(1)
+        return surveys
+
+    @staticmethod
+    def read_sidetrack_table(**kwargs):
+        """
+        read the table of sidetracks declaring their parent well and kick-off MD
+
+        :param kwargs: keywords of :class:`WellDatabase` with filename_sidetracks, headerlines_sidetracks and
+                       columns_sidetracks (WELL, PARENT WELL, KICK-OFF MD)
+        :return: dictionary of tuples (PARENT WELL, KICK-OFF MD) keyed by WELL NAME or None without sidetrack file
+        """
+        if kwargs['filename_sidetracks'] is None:
+            return None
+        print('Opening sidetrack file:')
+        sidetrackargs = {'datadir': kwargs['datadir'], 'filename_in': kwargs['filename_sidetracks'],
+                         'headerlines_in': kwargs['headerlines_sidetracks'],
+                         'columns_in': kwargs['columns_sidetracks'], 'cachedir': kwargs['cachedir']}
+        if len(kwargs['columns_sidetracks']) != 3:
+            print('Error: Column specification in sidetrack file requires three rows to be supplied\n\t'
+                  'format: WELL NAME, PARENT WELL NAME, KICK-OFF MD [length]')
+            sys.exit(1)
+        sidetracks = dict()
+        try:
+            for wellname, parent, kickoff in fileio.BHReaderWriter(**sidetrackargs).read_data():
+                sidetracks[wellname] = (parent, float(kickoff))
+        except ValueError as err:
+            print('Exception: Error during conversion of sidetrack file\n', err.args)
+            sys.exit(1)
+        return sidetracks
+
+    @staticmethod
+    def get_build_order(wellargs):
+        """
+        order wells so that parent wells precede their sidetracks (including sidetracks of sidetracks), sidetracks
+        of unknown parent wells or with circular references are set up with their full survey
+
+        :param wellargs: list of keyword dictionaries of :class:`Well` in well head order, sidetracks carry the
+                         WELL NAME of their parent
+        :return: list of keyword dictionaries
+        """
+        wellnames = set(args['wellname'] for args in wellargs)
+        for args in wellargs:
+            if 'parent' in args and args['parent'] not in wellnames:
+                print('Warning: Parent well {0:s} of sidetrack {1:s} not found, using full survey'.format(
+                    args['parent'], args['wellname']))
+                del args['parent'], args['kickoff']
+        ordered = []
+        placed = set()
+        remaining = wellargs
+        while remaining:
+            ready = [args for args in remaining if 'parent' not in args or args['parent'] in placed]
+            if not ready:
+                # every remaining well descends from a cycle, only the wells on a cycle lose their parent
+                cycle = WellDatabase.get_cycle_members(remaining)
+                for args in remaining:
+                    if args['wellname'] in cycle:
+                        print('Warning: Circular sidetrack reference of well {0:s}, using full survey'.format(
+                            args['wellname']))
+                        args.pop('parent', None)
+                        args.pop('kickoff', None)
+                continue
+            ordered.extend(ready)
+            placed.update(args['wellname'] for args in ready)
+            remaining = [args for args in remaining if args['wellname'] not in placed]
+        return ordered
+
+    @staticmethod
+    def get_cycle_members(wellargs):
+        """
+        find the sidetracks whose chain of parent wells leads back to themselves
+
+        :param wellargs: list of keyword dictionaries of :class:`Well`, sidetracks carry the WELL NAME of their parent
+        :return: set of WELL NAMES
+        """
+        parents = dict((args['wellname'], args.get('parent')) for args in wellargs)
+        members = set()
+        visited = set()
+        for wellname in parents:
+            path = []
+            while wellname in parents and wellname not in visited:
+                visited.add(wellname)
+                path.append(wellname)
+                wellname = parents[wellname]
+            if wellname in path:
+                # the chain has returned to a well of the current path
+                members.update(path[path.index(wellname):])
+        return members
+
+    def warm_up(self, wellnames=None):
+        """
+        eager loading of the geometries of lazily set up wells
+
+        :param wellnames: iterable of well names, Default ``None``: all wells
+        """
+        if wellnames is None:
+            wellnames = self.wells
+        for wellname in wellnames:
+            self.wells[wellname].load_geometry()
 
     def get_wells_sorted(self):
         """
@@ -360,6 +821,12 @@ def __str__(self):
     except FileNotFoundError:
         print('Exception: File not found during building of well database')
         sys.exit(1)
+    print('Creating well database from combined survey file:')
+    welldb = WellDatabase(datadir='..\\data', filename_survey='sample-fieldsurveys.txt', sort_survey=True)
+    print(welldb)
+    print('Loading geometries of lazily set up wells:')
+    welldb.warm_up(['NX-11212', 'Dog12'])
+    print([wellname for wellname, well in welldb.wells.items() if well.is_loaded()])
     print(TWIDTH*'=')
     print('Testing: Class WellMarker')
     inargs = {'datadir': '..\\data', 'filename_strat_def': 'sample-stratdef.txt',
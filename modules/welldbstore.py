@@ -0,0 +1,251 @@
+#!/usr/bin/python #Linux shebang plus chmod to make executable
+# ------------------------------------------------------------
+# FILENAME: welldbstore.py
+# VERSION: 1.0 - Python 3.6
+# PURPOSE:
+# AUTHOR: MVS
+# LAST CHANGE: 17/10/2026
+# ------------------------------------------------------------
+# tools for storing a well database in a local SQLite file and querying it
+
+
+import math
+import sqlite3
+import sys
+
+
+class WellDatabaseStore(object):
+    """
+    SQLite backend of a :class:`modules.welldatabase.WellDatabase` holding well heads, survey stations, resampled
+    points and markers in indexed tables, bounded queries run in SQLite without loading the field into Python
+
+    Cartesian positions are absolute: X(N), Y(E) in surface units and Z as TVDSS (positive downwards, below
+    reference level) in depth units of the well, survey stations of sidetracks start at their kick-off on the
+    parent well
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS wells (wellname TEXT PRIMARY KEY, x REAL, y REAL, kb REAL, filename TEXT, '
+        'depthunit TEXT, surfaceunit TEXT, parent TEXT, kickoff REAL)',
+        'CREATE INDEX IF NOT EXISTS wells_xy ON wells (x, y)',
+        'CREATE TABLE IF NOT EXISTS stations (wellname TEXT, md REAL, incl REAL, azim REAL, x REAL, y REAL, z REAL, '
+        'PRIMARY KEY (wellname, md))',
+        'CREATE INDEX IF NOT EXISTS stations_z ON stations (z)',
+        'CREATE TABLE IF NOT EXISTS points (wellname TEXT, md REAL, x REAL, y REAL, z REAL, '
+        'PRIMARY KEY (wellname, md))',
+        'CREATE INDEX IF NOT EXISTS points_z ON points (z)',
+        'CREATE TABLE IF NOT EXISTS markers (wellname TEXT, strat TEXT, md REAL, x REAL, y REAL, z REAL, '
+        'dip REAL, dazim REAL, PRIMARY KEY (wellname, strat))',
+        'CREATE INDEX IF NOT EXISTS markers_strat_z ON markers (strat, z)',
+    )
+    """tables and indices by well name, MD, TVDSS and marker code"""
+
+    def __init__(self, **kwargs):
+        """
+        constructor opens or creates the SQLite file
+
+        :param kwargs: keywords
+
+            - *filename* (``string``) -- SQLite file, Default ``'welldb.sqlite'``
+            - *verbose* (``bool``) -- verbose output, Default ``False``
+        """
+        kwargs.setdefault('filename', 'welldb.sqlite')
+        kwargs.setdefault('verbose', False)
+        self.filename = kwargs['filename']
+        self.verbose = kwargs['verbose']
+        self.connection = sqlite3.connect(self.filename)
+        with self.connection:
+            for statement in WellDatabaseStore.SCHEMA:
+                self.connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        close the SQLite file
+        """
+        self.connection.close()
+
+    def store_database(self, welldb, points=True):
+        """
+        store all wells of a well database including survey stations, resampled points and markers, geometries of
+        lazily set up wells are loaded
+
+        :param welldb: WellDatabase instance
+        :param points: store points resampled at the interpolation interval of the wells
+        """
+        with self.connection:
+            for well in welldb.wells.values():
+                self._store_well(well, points)
+        print('Number of wells stored: ', len(welldb.wells))
+
+    def store_well(self, well, points=True):
+        """
+        store or replace a single well including survey stations, resampled points and markers
+
+        :param well: Well instance
+        :param points: store points resampled at the interpolation interval of the well
+        """
+        with self.connection:
+            self._store_well(well, points)
+
+    def _store_well(self, well, points):
+        """
+        insert a well within the running transaction, previous rows of the well are replaced
+        """
+        geometry = well.geometry
+        wellname = well.wellname
+        for table in ('wells', 'stations', 'points', 'markers'):
+            self.connection.execute('DELETE FROM ' + table + ' WHERE wellname = ?', (wellname,))
+        parent = well.parent.wellname if well.parent is not None else None
+        # well head used by the geometry, sidetracks take over the well head of their parent
+        origin = geometry.origin
+        self.connection.execute('INSERT INTO wells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                (wellname, origin[0], origin[1], origin[2], geometry.filename_in,
+                                 geometry.depthunit, geometry.surfunit, parent, well.kickoff))
+        survey = geometry.survey
+        stations = []
+        for index in range(len(survey)):
+            position = geometry.get_cartesian_point(index)
+            stations.append((wellname, survey.md[index], math.degrees(survey.incl[index]),
+                             math.degrees(survey.azim[index]), position.x, position.y, position.z))
+        self.connection.executemany('INSERT OR REPLACE INTO stations VALUES (?, ?, ?, ?, ?, ?, ?)', stations)
+        if points:
+            mds = geometry.get_interpolation_mds()
+            self.connection.executemany('INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?)',
+                                        ((wellname, md, point.x, point.y, point.z)
+                                         for md, point in zip(mds, geometry.calculate_cart_points(mds))))
+        self._store_markers(well)
+
+    def store_markers(self, welldb):
+        """
+        replace the markers of all wells of a well database, e.g. after :class:`modules.welldatabase.WellMarkerLoading`
+
+        :param welldb: WellDatabase instance
+        """
+        with self.connection:
+            for well in welldb.wells.values():
+                self.connection.execute('DELETE FROM markers WHERE wellname = ?', (well.wellname,))
+                self._store_markers(well)
+
+    def _store_markers(self, well):
+        """
+        insert the markers of a well within the running transaction
+        """
+        rows = []
+        for strat, marker in well.markers.items():
+            position = well.geometry.calculate_cart_point(marker.md)
+            rows.append((well.wellname, strat, marker.md, position.x, position.y, position.z,
+                         math.degrees(marker.dip), math.degrees(marker.dazim)))
+        self.connection.executemany('INSERT OR REPLACE INTO markers VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def get_wells_sorted(self):
+        """
+        :return: list of well head rows (WELL NAME, X, Y, KB, FILENAME, DEPTHUNIT, SURFUNIT, PARENT, KICKOFF) sorted
+                 by well name
+        """
+        return self.connection.execute('SELECT * FROM wells ORDER BY wellname').fetchall()
+
+    def get_wells_within(self, x, y, radius):
+        """
+        wells with their well head within a horizontal radius, pre-selected by the index on the well head position
+
+        :param x: X(N) of the center in surface units
+        :param y: Y(E) of the center in surface units
+        :param radius: horizontal search radius in surface units
+        :return: list of tuples (WELL NAME, X, Y, distance) sorted by distance
+        """
+        rows = self.connection.execute(
+            'SELECT wellname, x, y, (x - ?) * (x - ?) + (y - ?) * (y - ?) AS dist2 FROM wells '
+            'WHERE x BETWEEN ? AND ? AND y BETWEEN ? AND ? AND dist2 <= ? ORDER BY dist2',
+            (x, x, y, y, x - radius, x + radius, y - radius, y + radius, radius * radius)).fetchall()
+        return [(wellname, wx, wy, math.sqrt(dist2)) for wellname, wx, wy, dist2 in rows]
+
+    def get_stations(self, wellname, mdmin=None, mdmax=None):
+        """
+        survey stations of a well within an optional MD range
+
+        :param wellname: well name
+        :param mdmin: minimum MD, Default ``None``: no bound
+        :param mdmax: maximum MD, Default ``None``: no bound
+        :return: list of tuples (MD, INCL, AZIM, X, Y, Z) sorted by MD
+        """
+        return self._query_md('SELECT md, incl, azim, x, y, z FROM stations', wellname, mdmin, mdmax)
+
+    def get_points(self, wellname, mdmin=None, mdmax=None):
+        """
+        resampled points of a well within an optional MD range
+
+        :param wellname: well name
+        :param mdmin: minimum MD, Default ``None``: no bound
+        :param mdmax: maximum MD, Default ``None``: no bound
+        :return: list of tuples (MD, X, Y, Z) sorted by MD
+        """
+        return self._query_md('SELECT md, x, y, z FROM points', wellname, mdmin, mdmax)
+
+    def _query_md(self, select, wellname, mdmin, mdmax):
+        """
+        run a query on a table keyed by well name and MD
+        """
+        condition, params = ' WHERE wellname = ?', [wellname]
+        if mdmin is not None:
+            condition += ' AND md >= ?'
+            params.append(mdmin)
+        if mdmax is not None:
+            condition += ' AND md <= ?'
+            params.append(mdmax)
+        return self.connection.execute(select + condition + ' ORDER BY md', params).fetchall()
+
+    def get_markers(self, strat=None, zmin=None, zmax=None, wellname=None):
+        """
+        markers filtered by marker code, TVDSS range and well, e.g. all K2M picks deeper than 3000 TVDSS:
+        get_markers('K2M', zmin=3000)
+
+        :param strat: marker code, Default ``None``: all markers
+        :param zmin: minimum TVDSS, Default ``None``: no bound
+        :param zmax: maximum TVDSS, Default ``None``: no bound
+        :param wellname: well name, Default ``None``: all wells
+        :return: list of tuples (WELL NAME, MARKER CODE, MD, X, Y, Z, DIP, DAZIM) sorted by well name and Z
+        """
+        conditions, params = [], []
+        for column, operator, value in (('strat', '=', strat), ('z', '>=', zmin), ('z', '<=', zmax),
+                                        ('wellname', '=', wellname)):
+            if value is not None:
+                conditions.append(column + ' ' + operator + ' ?')
+                params.append(value)
+        query = 'SELECT * FROM markers'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return self.connection.execute(query + ' ORDER BY wellname, z', params).fetchall()
+
+
+if __name__ == '__main__':                  # call test environment only if module is called standalone
+    from modules import welldatabase
+    TWIDTH = 79                             # terminal width excluding EOL
+    print(TWIDTH*'=')
+    print('module test: welldbstore'.ljust(TWIDTH, '-'))
+    print(TWIDTH*'=')
+    print('Building well database:')
+    try:
+        welldb = welldatabase.WellDatabase(datadir='..\\data', mode=0)
+        welldatabase.WellMarkerLoading(datadir='..\\data', welldatabase=welldb,
+                                       filename_strat_def='sample-stratdef.txt',
+                                       filename_strat_order='sample-stratorder.txt')
+    except FileNotFoundError:
+        print('Exception: File not found during building of well database')
+        sys.exit(1)
+    print(TWIDTH*'=')
+    print('Storing and querying:')
+    with WellDatabaseStore(filename=':memory:') as store:
+        store.store_database(welldb)
+        print(store.get_wells_sorted())
+        print(store.get_wells_within(234200, 11100, 2000))
+        print(store.get_markers('K2M', zmin=3000))
+        print(store.get_points('Dog12', 1000, 1500))
+    print(TWIDTH*'=')
+else:
+    print('Importing ' + __name__)
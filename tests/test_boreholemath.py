@@ -0,0 +1,78 @@
+# ------------------------------------------------------------
+# FILENAME: test_boreholemath.py
+# VERSION: 1.0 - Python 3.6
+# PURPOSE: tests of survey conversion
+# AUTHOR: MVS
+# LAST CHANGE: 17/10/2026
+# ------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from modules import boreholemath
+
+
+def write_data(datadir, filename, text):
+    """write a file at the location the readers compose from data directory and file name"""
+    with open(datadir + '\\' + filename, 'w') as file:
+        file.write(text)
+
+
+def read_data(datadir, filename):
+    """read a file written to data directory and file name"""
+    with open(datadir + '\\' + filename) as file:
+        return file.read()
+
+
+class StreamBoreHoleSurveyTest(unittest.TestCase):
+    """streaming conversion compared with the batch conversion of the same survey"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.datadir = os.path.join(self.tempdir, 'data')
+        os.mkdir(self.datadir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_zero_length_pair(self):
+        # equal consecutive MDs are accepted by the survey reader
+        write_data(self.datadir, 'zero.txt', 'ID,MD,INCL,AZIM\n1,0,0,0\n2,500,5,10\n3,500,6,12\n4,1000,10,20\n')
+        names = {1: 'out_zero_borehole_cart_orig.txt', 2: 'out_zero_borehole_curve_inter.txt',
+                 3: 'out_zero_borehole_cart_inter.txt'}
+        for mode, filename in names.items():
+            inargs = {'datadir': self.datadir, 'filename_in': 'zero.txt', 'wellname': 'zero', 'mode': mode}
+            boreholemath.StreamBoreHoleSurvey(**inargs)
+            streamed = read_data(self.datadir, filename)
+            boreholemath.TransformBoreHoleSurvey(survey_cache=False, **inargs)
+            self.assertEqual(streamed, read_data(self.datadir, filename))
+
+
+class SidetrackTest(unittest.TestCase):
+    """sidetracks referencing the trajectory of their parent above the kick-off"""
+
+    PARENT = ([0.0, 500.0, 1000.0], [0.0, 5.0, 10.0], [0.0, 10.0, 20.0])
+    BRANCH = ([1200.0, 1500.0], [20.0, 35.0], [40.0, 60.0])
+
+    def setUp(self):
+        self.parent = boreholemath.TransformBoreHoleSurvey(survey_data=self.PARENT, wellname='P', mode=0)
+
+    def get_positions(self, survey):
+        return [(point.x, point.y, point.z) for mode in (1, 3) for point in survey.get_output_points(mode)]
+
+    def test_parent_append_station(self):
+        for kickoff in (700.0, 1000.0):
+            sidetrack = boreholemath.TransformBoreHoleSurvey(survey_data=self.BRANCH, wellname='S', mode=0,
+                                                             parent=self.parent, kickoff=kickoff)
+            before = self.get_positions(sidetrack)
+            self.parent.append_station(self.parent.survey.md[-1] + 500.0, 15.0, 30.0)
+            self.assertEqual(self.get_positions(sidetrack), before)
+            rebuilt = boreholemath.TransformBoreHoleSurvey(survey_data=self.BRANCH, wellname='S', mode=0,
+                                                           parent=self.parent, kickoff=kickoff)
+            self.assertEqual(self.get_positions(rebuilt), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
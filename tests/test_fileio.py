@@ -0,0 +1,82 @@
+# ------------------------------------------------------------
+# FILENAME: test_fileio.py
+# VERSION: 1.0 - Python 3.6
+# PURPOSE: tests of reading and writing files
+# AUTHOR: MVS
+# LAST CHANGE: 17/10/2026
+# ------------------------------------------------------------
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+from modules import fileio
+
+
+def write_data(datadir, filename, text):
+    """write a file at the location the readers compose from data directory and file name"""
+    with open(datadir + '\\' + filename, 'w') as file:
+        file.write(text)
+
+
+class ParseCacheTest(unittest.TestCase):
+    """binary parse cache of BHReaderWriter"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.datadir = os.path.join(self.tempdir, 'data')
+        self.cachedir = os.path.join(self.tempdir, 'cache')
+        os.mkdir(self.datadir)
+        write_data(self.datadir, 'survey.txt', 'ID,MD,INCL,AZIM\n1,0,0,0\n2,500,5,10\n')
+        self.inargs = {'datadir': self.datadir, 'filename_in': 'survey.txt', 'cachedir': self.cachedir}
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_cache_round_trip(self):
+        expected = fileio.BHReaderWriter(**self.inargs).read_data()
+        cachefile, _ = fileio.BHReaderWriter(**self.inargs)._get_cache_key(('rows',))
+        self.assertTrue(os.path.exists(cachefile))
+        self.assertEqual(glob.glob(cachefile + '*.tmp'), [])
+        self.assertEqual(fileio.BHReaderWriter(**self.inargs).read_data(), expected)
+
+    def test_damaged_cache_is_a_miss(self):
+        expected = fileio.BHReaderWriter(**self.inargs).read_data()
+        cachefile, _ = fileio.BHReaderWriter(**self.inargs)._get_cache_key(('rows',))
+        for content in (b'\x80\x04\x95', b'\x80\x04N.', b'not a pickle'):
+            with open(cachefile, 'wb') as file:
+                file.write(content)
+            self.assertEqual(fileio.BHReaderWriter(**self.inargs).read_data(), expected)
+
+
+class IndexedReaderTest(unittest.TestCase):
+    """memory-mapped row access of BHIndexedReader"""
+
+    def setUp(self):
+        self.datadir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.datadir)
+
+    def test_empty_file(self):
+        write_data(self.datadir, 'empty.txt', '')
+        with fileio.BHIndexedReader(datadir=self.datadir, filename_in='empty.txt', headerlines_in=1,
+                                    key_column=0, persist_index=False) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(reader.read_rows(), [])
+            self.assertEqual(reader.read_key('A'), [])
+        self.assertTrue(reader.file.closed)
+
+    def test_rows_and_keys(self):
+        write_data(self.datadir, 'markers.txt', 'WELL,MD\nA,100\nB,200\nA,300\n')
+        with fileio.BHIndexedReader(datadir=self.datadir, filename_in='markers.txt', headerlines_in=1,
+                                    columns_in=(0, 1), key_column=0, persist_index=False) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader.read_rows(1, 2), [['B', '200']])
+            self.assertEqual(reader.read_key('A'), [['A', '100'], ['A', '300']])
+
+
+if __name__ == '__main__':
+    unittest.main()
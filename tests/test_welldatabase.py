@@ -0,0 +1,104 @@
+# ------------------------------------------------------------
+# FILENAME: test_welldatabase.py
+# VERSION: 1.0 - Python 3.6
+# PURPOSE: tests of well database building
+# AUTHOR: MVS
+# LAST CHANGE: 17/10/2026
+# ------------------------------------------------------------
+
+import io
+import os
+import shutil
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from modules import boreholemath
+from modules import welldatabase
+
+
+SURVEY = 'ID,MD,INCL,AZIM\n1,0,0,0\n2,500,5,10\n3,1000,10,20\n4,1500,15,30\n'
+"""valid deviation survey"""
+
+
+def write_data(datadir, filename, text):
+    """write a file at the location the readers compose from data directory and file name"""
+    with open(datadir + '\\' + filename, 'w') as file:
+        file.write(text)
+
+
+class WellDatabaseTest(unittest.TestCase):
+    """building of a well database from a well head file and survey files"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.datadir = os.path.join(self.tempdir, 'data')
+        os.mkdir(self.datadir)
+        write_data(self.datadir, 'a.txt', SURVEY)
+        write_data(self.datadir, 'b.txt', SURVEY)
+        write_data(self.datadir, 'wellheads.txt', 'ID,Name,X,Y,KB,DEV\n1,A,1000,2000,10,a.txt\n'
+                                                  '2,B,1100,2100,20,b.txt\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_bad_survey_in_worker_process(self):
+        write_data(self.datadir, 'b.txt', 'ID,MD,INCL,AZIM\n1,0,0,0\n2,500,5,10\n3,400,10,20\n')
+        with self.assertRaises(SystemExit):
+            welldatabase.WellDatabase(datadir=self.datadir, filename_in='wellheads.txt', processes=2)
+
+    def test_snapshot_holds_loaded_geometries(self):
+        inargs = {'datadir': self.datadir, 'filename_in': 'wellheads.txt',
+                  'snapshot': os.path.join(self.tempdir, 'snapshot.pkl')}
+        welldatabase.WellDatabase(**inargs)
+        welldb = welldatabase.WellDatabase(**inargs)
+        self.assertEqual(sorted(welldb.wells), ['A', 'B'])
+        for well in welldb.wells.values():
+            self.assertTrue(well.is_loaded())
+
+    def test_concurrent_first_access_loads_once(self):
+        welldb = welldatabase.WellDatabase(datadir=self.datadir, filename_in='wellheads.txt')
+        well = welldb.wells['A']
+        survey = boreholemath.TransformBoreHoleSurvey
+
+        def slow_survey(**kwargs):
+            # widens the window between the check and the assignment of the lazy load
+            time.sleep(0.05)
+            return survey(**kwargs)
+
+        with mock.patch.object(boreholemath, 'TransformBoreHoleSurvey', side_effect=slow_survey) as builder:
+            threads = [threading.Thread(target=well.load_geometry) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(builder.call_count, 1)
+        copy = pickle.loads(pickle.dumps(well))
+        self.assertTrue(copy.is_loaded())
+        self.assertEqual(copy.geometry.get_md_range(), well.geometry.get_md_range())
+
+    def test_build_order_breaks_cycles_only(self):
+        wellargs = [{'wellname': 'C', 'parent': 'A', 'kickoff': 700.0},
+                    {'wellname': 'A', 'parent': 'B', 'kickoff': 500.0},
+                    {'wellname': 'B', 'parent': 'A', 'kickoff': 600.0},
+                    {'wellname': 'D', 'parent': 'C', 'kickoff': 800.0},
+                    {'wellname': 'E'}]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            ordered = welldatabase.WellDatabase.get_build_order(wellargs)
+        self.assertEqual([args['wellname'] for args in ordered], ['E', 'A', 'B', 'C', 'D'])
+        parents = dict((args['wellname'], args.get('parent')) for args in ordered)
+        self.assertEqual(parents, {'A': None, 'B': None, 'C': 'A', 'D': 'C', 'E': None})
+        warnings = output.getvalue()
+        self.assertIn('well A,', warnings)
+        self.assertIn('well B,', warnings)
+        self.assertNotIn('well C,', warnings)
+        self.assertNotIn('well D,', warnings)
+
+
+if __name__ == '__main__':
+    unittest.main()